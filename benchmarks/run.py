@@ -0,0 +1,266 @@
+"""
+The DataForge benchmark suite. Every scenario builds a synthetic schema, fills it and reports
+the time spent in each stage of a run, the rows per second and the peak memory. Run it from
+the repository root:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+
+The second form exits with status 1 when a scenario regressed against the stored results.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+
+from benchmarks import schemas
+
+# The stages timed in every scenario by the metrics of the run, each one's time
+# excludes the stages run inside it
+STAGES = [
+    "introspection",
+    "arrange_graph",
+    "resolution",
+    "generation",
+    "fk_sampling",
+    "key_index",
+    "insertion",
+    "deferred_keys",
+]
+
+# Stages faster than this many seconds are too noisy to be compared
+NOISE_SECONDS = 0.1
+
+
+def peak_memory_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_scenario(name, url, scale, sink, processes, columnar):
+    """
+    The function `run_scenario` creates the schema of a scenario, fills it and returns its
+    measures. It runs in a process of its own, so the peak memory is the scenario's.
+    """
+    import data
+    from src.populate import DatabasePopulator
+    from src.schema import SchemaModel
+
+    _, rows_per_table = schemas.SCENARIOS[name]
+    rows = max(1, int(rows_per_table * scale))
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        engine = create_engine(url)
+        metadata = schemas.build(name)
+        metadata.drop_all(engine)
+        metadata.create_all(engine)
+
+        started_at = time.perf_counter()
+        model = SchemaModel.reflect(engine)
+        introspection = time.perf_counter() - started_at
+        # The populator reads the schema introspected above instead of doing it again
+        schema_file = os.path.join(directory, "schema.pickle")
+        model.write(schema_file)
+
+        metrics_file = os.path.join(directory, "metrics.json")
+        started_at = time.perf_counter()
+        populator = DatabasePopulator(
+            user=None,
+            password=None,
+            host=None,
+            database=None,
+            url=url,
+            rows=rows,
+            tables_to_fill=list(metadata.tables),
+            graph=False,
+            special_fields=data.fields,
+            special_foreign_fields=data.special_foreign_fields,
+            schema_file=schema_file,
+            schema_cache=None,
+            state_file=None,
+            processes=processes,
+            generator_module=data.__name__,
+            sink=sink,
+            output=os.path.join(directory, "output"),
+            metrics_file=metrics_file,
+            columnar=columnar,
+            headless=True,
+        )
+        elapsed = time.perf_counter() - started_at + introspection
+        inserted = populator.current_progress
+        with open(metrics_file, encoding="utf-8") as f:
+            seconds = json.load(f)["stages"]
+        seconds["introspection"] = seconds.get("introspection", 0.0) + introspection
+        # Everything outside the stages, such as drawing the graph
+        seconds["other"] = max(0.0, elapsed - sum(seconds.values()))
+        metadata.drop_all(engine)
+        engine.dispose()
+
+    return {
+        "tables": len(metadata.tables),
+        "rows": inserted,
+        "seconds": round(elapsed, 4),
+        "rows_per_second": round(inserted / max(elapsed, 1e-9), 1),
+        "peak_memory_mb": peak_memory_mb(),
+        "stages": {
+            stage: {
+                "seconds": round(seconds.get(stage, 0.0), 4),
+                "rows_per_second": round(inserted / max(seconds.get(stage, 0.0), 1e-9), 1),
+            }
+            for stage in [*STAGES, "other"]
+        },
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    The function `compare` returns a description of every measure of `results` which is more
+    than `threshold` (a share, 0.2 for 20%) worse than in `baseline`.
+    """
+    regressions = []
+
+    def check(label, current, previous, higher_is_better=False):
+        if current is None or not previous:
+            return
+        change = (current - previous) / previous
+        if (-change if higher_is_better else change) > threshold:
+            regressions.append(f"{label}: {previous} -> {current} ({change:+.0%})")
+
+    for name, current in results["scenarios"].items():
+        if (previous := baseline.get("scenarios", {}).get(name)) is None:
+            continue
+        check(
+            f"{name} rows_per_second",
+            current["rows_per_second"],
+            previous["rows_per_second"],
+            higher_is_better=True,
+        )
+        check(f"{name} peak_memory_mb", current["peak_memory_mb"], previous["peak_memory_mb"])
+        for stage, measures in current["stages"].items():
+            before = previous["stages"].get(stage, {}).get("seconds")
+            if before and max(before, measures["seconds"]) >= NOISE_SECONDS:
+                check(f"{name} {stage} seconds", measures["seconds"], before)
+    return regressions
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark DataForge on synthetic schemas.")
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(schemas.SCENARIOS),
+        help=f"Comma separated scenarios among {', '.join(schemas.SCENARIOS)}.",
+    )
+    parser.add_argument(
+        "--url",
+        help="SQLAlchemy URL of the database to fill, e.g. a local MySQL. A temporary "
+        "SQLite file per scenario by default. Only the bench_* tables are created and dropped.",
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiplies the rows of every scenario."
+    )
+    parser.add_argument("--sink", default="insert", help="The sink the rows are written with.")
+    parser.add_argument(
+        "--processes", type=int, default=1, help="Number of generator processes."
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Fill the batches a column at a time, see `columnar` in data.py.",
+    )
+    parser.add_argument("--output", help="JSON file the results are written to.")
+    parser.add_argument(
+        "--baseline", help="JSON results of an earlier run to compare the results with."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Share by which a measure must be worse than the baseline to count as a "
+        "regression (default 0.2 for 20%%).",
+    )
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+    if arguments.child:
+        measures = run_scenario(
+            arguments.child,
+            arguments.url,
+            arguments.scale,
+            arguments.sink,
+            arguments.processes,
+            arguments.columnar,
+        )
+        print(json.dumps(measures))
+        return 0
+
+    results = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": (arguments.url or "sqlite").split(":", 1)[0],
+            "sink": arguments.sink,
+            "processes": arguments.processes,
+            "columnar": arguments.columnar,
+            "scale": arguments.scale,
+        },
+        "scenarios": {},
+    }
+    for name in arguments.scenarios.split(","):
+        if name not in schemas.SCENARIOS:
+            raise SystemExit(f"I don't know the scenario '{name}'.")
+        command = [sys.executable, "-m", "benchmarks.run", "--child", name]
+        for option in ("url", "scale", "sink", "processes"):
+            if (value := getattr(arguments, option)) is not None:
+                command += [f"--{option}", str(value)]
+        if arguments.columnar:
+            command.append("--columnar")
+        finished = subprocess.run(command, capture_output=True, text=True)
+        if finished.returncode:
+            sys.stderr.write(finished.stderr)
+            raise SystemExit(f"The scenario '{name}' failed.")
+        measures = json.loads(finished.stdout.strip().splitlines()[-1])
+        results["scenarios"][name] = measures
+
+        stages = ", ".join(
+            f"{stage} {values['seconds']:.2f}s"
+            for stage, values in measures["stages"].items()
+        )
+        print(
+            f"{name}: {measures['rows']} rows in {measures['tables']} tables, "
+            f"{measures['seconds']:.2f}s, {measures['rows_per_second']:.0f} rows/s, "
+            f"{measures['peak_memory_mb']} MB peak ({stages})"
+        )
+
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if arguments.baseline:
+        with open(arguments.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if regressions := compare(results, baseline, arguments.threshold):
+            print("Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regression against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
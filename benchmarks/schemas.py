@@ -0,0 +1,125 @@
+import random
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+)
+
+# Types of the generated columns, they're all matched by the type rules of `data.py`
+COLUMN_TYPES = [
+    lambda: Integer(),
+    lambda: String(50),
+    lambda: Float(),
+    lambda: Date(),
+    lambda: DateTime(),
+    lambda: Boolean(),
+    lambda: Text(),
+]
+
+
+def wide(metadata, columns: int = 200):
+    """
+    The function `wide` builds a single table with `columns` columns of every type.
+    """
+    Table(
+        "bench_wide",
+        metadata,
+        Column("id", BigInteger, primary_key=True),
+        *(
+            Column(f"c{index}", COLUMN_TYPES[index % len(COLUMN_TYPES)]())
+            for index in range(columns)
+        ),
+    )
+
+
+def chain(metadata, depth: int = 30):
+    """
+    The function `chain` builds `depth` tables, each referring to the previous one.
+    """
+    for level in range(depth):
+        Table(
+            f"bench_chain_{level}",
+            metadata,
+            Column("id", BigInteger, primary_key=True),
+            *(
+                [
+                    Column(
+                        "parent_id",
+                        BigInteger,
+                        ForeignKey(f"bench_chain_{level - 1}.id"),
+                        nullable=False,
+                    )
+                ]
+                if level
+                else []
+            ),
+            Column("label", String(50)),
+            Column("amount", Integer),
+        )
+
+
+def unique(metadata, columns: int = 30):
+    """
+    The function `unique` builds a table with `columns` unique integer and string columns.
+    """
+    Table(
+        "bench_unique",
+        metadata,
+        Column("id", BigInteger, primary_key=True),
+        *(
+            Column(
+                f"u{index}",
+                Integer() if index % 2 else String(40),
+                unique=True,
+            )
+            for index in range(columns)
+        ),
+    )
+
+
+def many(metadata, tables: int = 2000):
+    """
+    The function `many` builds `tables` small tables, each referring to up to two tables
+    built before it, picked with a fixed seed so that every run gets the same schema.
+    """
+    rng = random.Random(0)
+    for index in range(tables):
+        parents = rng.sample(range(index), min(index, rng.randint(0, 2)))
+        Table(
+            f"bench_many_{index}",
+            metadata,
+            Column("id", BigInteger, primary_key=True),
+            *(
+                Column(f"ref_{parent}", BigInteger, ForeignKey(f"bench_many_{parent}.id"))
+                for parent in parents
+            ),
+            Column("name", String(50)),
+        )
+
+
+# name -> (builder, rows per table at scale 1)
+SCENARIOS = {
+    "wide": (wide, 2_000),
+    "chain": (chain, 1_000),
+    "unique": (unique, 5_000),
+    "many": (many, 5),
+}
+
+
+def build(name):
+    """
+    The function `build` returns the metadata of a scenario's schema.
+    """
+    metadata = MetaData()
+    SCENARIOS[name][0](metadata)
+    return metadata
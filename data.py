@@ -1,15 +1,21 @@
 import datetime
 from decimal import Decimal
 import json
-import os
-import faker
-import uuid
+
+from src import vectorized
+from src.spec import LazyFaker, load_spec
 
 # ┏━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # ┃ Customize Tool Behavior
 # ┗━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-# ➤ `number_of_fields`: Determines the number of rows to insert.
+# ➤ `number_of_fields`: Determines the number of rows to insert into each table not listed in `table_rows`.
+
+# ➤ `table_rows`: The number of rows of specific tables, by table name.
+#     ➜ `"countries": 50`: Exactly 50 rows.
+#     ➜ `"orders": {"per": "users", "ratio": 20}`: 20 rows per row of `users`.
+#     ➜ `"events": {"bytes": "2GB"}`: About 2GB of rows, the size of a row is estimated from
+#       the column types.
 
 # ➤ `excluded_tables`: A list of tables to exclude from data insertion.
 
@@ -17,6 +23,106 @@ import uuid
 
 # ➤ `graph`: Displays the graph after data insertion.
 
+# ➤ `batch_size`: The maximum number of rows sent to the database in one insert batch.
+
+# ➤ `batch_bytes`: The approximate maximum size (in bytes) of one insert batch.
+
+# ➤ `columnar`: Generates each batch a column at a time and writes it without building a dict per
+#   row, which is faster for narrow tables with many rows.
+
+# ➤ `key_index_bytes`: Memory budget (in bytes) for the values of unique and referenced columns
+#   kept in memory during a run. Set to `None` for no limit.
+
+# ➤ `unique_filter_bytes`: Memory budget (in bytes) of a unique column that no foreign key refers
+#   to. Larger columns are streamed into a Bloom filter of that size and only the values colliding
+#   in it are looked up in the table. Set to `None` to keep every column in memory.
+
+# ➤ `schema_cache`: Directory where the database structure is cached between runs, so an
+#   unchanged schema isn't introspected again. Set to `None` to disable the cache.
+
+# ➤ `workers`: Number of tables filled at the same time. A table starts once all the tables it
+#   refers to are filled. Tables referring to each other in a cycle get a nullable foreign key
+#   filled once every table is.
+
+# ➤ `processes`: Number of processes generating column values, for CPU heavy generators.
+#   Values are generated in the main process when it's 1.
+
+# ➤ `async_driver`: An asyncio database driver (e.g. "aiomysql", installed separately). When set,
+#   rows are inserted through an asyncio pipeline that overlaps generation with database I/O.
+#   Only works with the "insert" sink.
+
+# ➤ `async_connections`: Number of insert batches in flight when `async_driver` is set.
+
+# ➤ `sink`: How rows are written. "insert" sends batched inserts, "load_data" streams each table
+#   through MySQL's `LOAD DATA LOCAL INFILE` and "copy" through PostgreSQL's `COPY FROM STDIN`,
+#   both fall back to "insert" when they aren't available. "bulk" picks the fastest way of the
+#   database in use, on SQLite it's a single transaction per table.
+
+# ➤ `load_data_chunk_rows`: Number of rows sent per `LOAD DATA` or `COPY` statement.
+
+# ➤ `output`: Directory of the files written by the file sinks: "sql" writes a `dump.sql` of
+#   multi-row inserts, "csv" one `<table>.csv` per table and "parquet" one `<table>.parquet`.
+
+# ➤ `compression`: "gzip" to compress the "sql" and "csv" files, or a Parquet codec such as
+#   "snappy" or "zstd" for the "parquet" sink. Set to `None` for no compression.
+
+# ➤ `schema_file`: A schema cache file (from `schema_cache`) to read the database structure
+#   from, so the file sinks can run without connecting to the database.
+
+# ➤ `foreign_distributions`: How the rows of a table are spread over the rows they refer to, by
+#   "table.column" of the foreign key. Foreign keys not listed pick their parent uniformly.
+#     ➜ `{"distribution": "zipf", "exponent": 1.2}`: A few parents get most of the children.
+#     ➜ `{"distribution": "fixed", "children": 3}`: Every parent gets the same number of children.
+
+# ➤ `value_pools`: Samples the values of slow generators (e.g. `fake.address()` or `fake.profile()`)
+#   from pools generated ahead instead of calling them for every row. A rule is pooled when a
+#   call takes more than `pool_threshold` seconds, or when it sets `"pool": True`, unless it sets
+#   `"pool": False`. Unique columns always call their generator.
+
+# ➤ `pool_size`: Number of values generated ahead per pooled rule.
+
+# ➤ `pool_bytes`: Memory budget (in bytes) of all the pools. Set to `None` for no limit.
+
+# ➤ `pool_remix`: Share of pooled values generated anew instead (e.g. 0.05), so the pools keep
+#   changing over long runs.
+
+# ➤ `pool_threshold`: Cost (in seconds) per call above which a rule is pooled.
+
+# ➤ `pool_dir`: Directory where the pools are saved and reused by the next run. Set to `None`
+#   to regenerate them on every run.
+
+# ➤ `seed`: An integer making runs reproducible, every block of rows of every column gets its own
+#   seed derived from it. Generators should draw from `fake` (e.g. `fake.uuid4()` rather than
+#   `uuid.uuid4()`) for their values to be reproduced. Set to `None` for random runs.
+#   `python main.py --table orders --row-range 0:1000000` then generates a shard of a table
+#   exactly as a full run with the same seed would, so shards can run on different machines.
+
+# ➤ `state_file`: JSON file where the filled tables and the rows committed so far are recorded, so
+#   `python main.py --resume` continues an interrupted run after its last committed batch. Set
+#   to `None` to keep no record. Only used when filling a database.
+
+# ➤ `fast_load`: Turns off the database's foreign key and unique checks for the connections of the
+#   run (`foreign_key_checks` and `unique_checks` on MySQL), which DataForge makes redundant by
+#   filling the tables in dependency order. The filled tables are checked with a few bulk queries
+#   at the end of the run instead.
+
+# ➤ `drop_indexes`: With `fast_load`, drops the non-unique secondary indexes of every table while
+#   it's filled and recreates them once it is. The indexes foreign keys rely on are kept.
+
+# ➤ `metrics_file`: JSON file where the measures of the run are written at its end: the time per
+#   stage, the cost and calls of every column's generator, the retries of unique columns, the
+#   latency of the database round trips and the rows/s per table. Set to `None` to skip them.
+
+# ➤ `prometheus_file`: File rewritten with the same measures in the Prometheus text format during
+#   the run, for the node exporter's textfile collector. `None` by default.
+
+# ➤ `profiler`: Runs under `cprofile` or the lighter `sampling` profiler, which writes collapsed
+#   stacks for flame graph tools, to `profile_file`. `python main.py --profile sampling` sets it too.
+
+# ➤ `spec_file`: A TOML (or YAML, with PyYAML installed) file of rules mapping column names and
+#   types to Faker providers and their arguments. It's read as data, without running Python, and
+#   its `fields` and `special_foreign_fields` replace the ones below when it's set.
+
 # ➤ `special_foreign_fields`: Contains instructions for identifying and filling foreign referencing columns.
 #     ➜ `Field Name`: The name of the field.
 #     ➜ `Field Type`: The type of the field.
@@ -25,16 +131,51 @@ import uuid
 
 # ➤ `field`: Contains instructions for identifying and filling columns.
 #     ** Keys are similar to `special_foreign_fields` **
+#     ➜ `Batch Generation`: Optional, a generator from `src.vectorized` producing the values of a
+#       whole batch in one NumPy call. It's used instead of `generator` when given.
 
 
 # Feel free to adjust these configurations based on your specific requirements.
 
 
-fake = faker.Faker()
+# Faker is imported and built the first time a generator uses it
+fake = LazyFaker()
 number_of_fields = 40
+table_rows = {}
 excluded_tables = []
 tables_to_fill = []
 graph = False
+batch_size = 1000
+batch_bytes = 1024 * 1024
+columnar = False
+key_index_bytes = None
+unique_filter_bytes = None
+schema_cache = ".dataforge"
+workers = 1
+processes = 1
+async_driver = None
+async_connections = 4
+sink = "insert"
+load_data_chunk_rows = 100_000
+output = "output"
+compression = None
+schema_file = None
+foreign_distributions = {}
+value_pools = False
+pool_size = 10_000
+pool_bytes = 64 * 1024 * 1024
+pool_remix = 0.0
+pool_threshold = 0.0001
+pool_dir = ".dataforge/pools"
+seed = None
+state_file = ".dataforge/state.json"
+fast_load = False
+drop_indexes = False
+metrics_file = None
+prometheus_file = None
+profiler = None
+profile_file = None
+spec_file = None
 
 special_foreign_fields = [
     {
@@ -50,7 +191,7 @@ fields = [
         "name": r"(\bid)|(_id)|(id_)",
         "type": "varchar",
         "table": None,
-        "generator": lambda: str(uuid.uuid4()),
+        "generator": lambda: fake.uuid4(),
     },
     {
         "name": "first_name",
@@ -207,48 +348,56 @@ fields = [
         "type": "float",
         "table": None,
         "generator": lambda: fake.random_element(elements=(1.0, 10.0)),
+        "batch": vectorized.Choice((1.0, 10.0)),
     },
     {
         "name": None,
         "type": "date",
         "table": None,
         "generator": lambda: fake.date(),
+        "batch": vectorized.Dates(),
     },
     {
         "name": None,
         "type": "datetime",
         "table": None,
         "generator": lambda: fake.date_time(),
+        "batch": vectorized.DateTimes(),
     },
     {
         "name": None,
         "type": "boolean",
         "table": None,
         "generator": lambda: fake.boolean(),
+        "batch": vectorized.Booleans(),
     },
     {
         "name": None,
         "type": "tinyint",
         "table": None,
         "generator": lambda: fake.random_int(min=0, max=1),
+        "batch": vectorized.Integers(0, 1),
     },
     {
         "name": None,
         "type": "bigint",
         "table": None,
         "generator": lambda: fake.random_int(min=0, max=9223372036854775807),
+        "batch": vectorized.Integers(0, 9223372036854775807),
     },
     {
         "name": None,
         "type": "integer",
         "table": None,
         "generator": lambda: fake.random_int(min=0, max=100),
+        "batch": vectorized.Integers(0, 100),
     },
     {
         "name": None,
         "type": "smallint",
         "table": None,
         "generator": lambda: fake.random_int(min=0, max=32767),
+        "batch": vectorized.Integers(0, 32767),
     },
     {
         "name": None,
@@ -260,7 +409,8 @@ fields = [
         "name": None,
         "type": "uuid",
         "table": None,
-        "generator": lambda: str(uuid.uuid4()),
+        "generator": lambda: fake.uuid4(),
+        "batch": vectorized.UUIDs(),
     },
     {
         "name": None,
@@ -273,12 +423,14 @@ fields = [
         "type": "decimal",
         "table": None,
         "generator": lambda: Decimal(fake.random_number(digits=5)) / 100,
+        "batch": vectorized.Decimals(5, scale=2),
     },
     {
         "name": None,
         "type": "numeric",
         "table": None,
         "generator": lambda: fake.random_number(digits=5),
+        "batch": vectorized.Integers(0, 99999),
     },
     {
         "name": None,
@@ -302,7 +454,8 @@ fields = [
         "name": None,
         "type": "binary",
         "table": None,
-        "generator": lambda: os.urandom(10),
+        "generator": lambda: fake.binary(length=10),
+        "batch": vectorized.RandomBytes(10),
     },
     {
         "name": None,
@@ -340,13 +493,15 @@ fields = [
         "name": None,
         "type": "varbinary",
         "table": None,
-        "generator": lambda: os.urandom(20),
+        "generator": lambda: fake.binary(length=20),
+        "batch": vectorized.RandomBytes(20),
     },
     {
         "name": None,
         "type": "mediumint",
         "table": None,
         "generator": lambda: fake.random_int(min=0, max=16777215),
+        "batch": vectorized.Integers(0, 16777215),
     },
     {
         "name": None,
@@ -385,3 +540,6 @@ fields = [
         "generator": lambda: fake.text(max_nb_chars=255),
     },
 ]
+
+if spec_file:
+    fields, special_foreign_fields = load_spec(spec_file, fake)
@@ -1,3 +1,6 @@
+import argparse
+import logging
+
 from src.populate import DatabasePopulator
 from decouple import config
 from rich.traceback import install
@@ -10,40 +13,132 @@ def configure_database():
     Read database configuration from environment variables.
 
     Reads the following environment variables:
+    - DB_URL:      A SQLAlchemy database URL, e.g. `sqlite:///test.db`. When it's set,
+                   the other variables aren't needed.
     - DB_HOST:     Database host name or IP address.
     - DB_USER:     Database username.
     - DB_PASSWORD: Database password.
     - DB_NAME:     Database name.
 
     Returns:
-    Tuple (str, str, str, str): A tuple containing (host, user, password, database).
+    Tuple (str, str, str, str, str): A tuple containing (url, host, user, password, database).
     """
     # Read database configuration
+    db_url = config("DB_URL", default=None)
+    if db_url:
+        return db_url, None, None, None, None
+
     db_host = config("DB_HOST")
     db_user = config("DB_USER")
     db_password = config("DB_PASSWORD")
     db_database = config("DB_NAME")
 
-    return db_host, db_user, db_password, db_database
+    return db_url, db_host, db_user, db_password, db_database
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Populate a database with realistic test data."
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Don't draw the dashboard, only log the insertion rate periodically.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed of a reproducible run, overrides `seed` in data.py.",
+    )
+    parser.add_argument(
+        "--table",
+        help="Fill only this table, overrides `tables_to_fill` in data.py.",
+    )
+    parser.add_argument(
+        "--row-range",
+        type=parse_row_range,
+        help="Generate only the rows A to B (excluded) of the tables, as A:B. Needs a seed.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the interrupted run recorded in `state_file`.",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["cprofile", "sampling"],
+        help="Run under a profiler, overrides `profiler` in data.py.",
+    )
+    return parser.parse_args()
+
+
+def parse_row_range(value):
+    start, _, end = value.partition(":")
+    try:
+        return int(start), int(end)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"I can't read the row range '{value}', it should look like 0:1000."
+        )
 
 
 def main():
     install()
     console = Console()
+    arguments = parse_arguments()
+    if arguments.headless:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
     try:
-        db_host, db_user, db_password, db_database = configure_database()
+        db_url, db_host, db_user, db_password, db_database = configure_database()
 
         DatabasePopulator(
             user=db_user,
             password=db_password,
             host=db_host,
             database=db_database,
+            url=db_url,  # SQLAlchemy URL of the database, used instead of the MySQL settings
             rows=data.number_of_fields,  # Number of rows to insert
+            table_rows=data.table_rows,  # Row targets of specific tables (rows, ratios or sizes)
             excluded_tables=data.excluded_tables,  # List of tables to exclude from insertion
-            tables_to_fill=data.tables_to_fill,  # List of tables to insert data into
+            tables_to_fill=[arguments.table] if arguments.table else data.tables_to_fill,  # List of tables to insert data into
             graph=data.graph,  # Show table relation graph (True/False)
             special_fields=data.fields,  # Instructions for identifying and filling columns
             special_foreign_fields=data.special_foreign_fields,  # Instructions for identifying and filling columns
+            batch_size=data.batch_size,  # Maximum number of rows per insert batch
+            batch_bytes=data.batch_bytes,  # Approximate maximum size of an insert batch
+            columnar=data.columnar,  # Generate and write batches a column at a time
+            key_index_bytes=data.key_index_bytes,  # Memory budget of unique and referenced values
+            unique_filter_bytes=data.unique_filter_bytes,  # Bloom filter size of large unique columns
+            schema_cache=data.schema_cache,  # Directory of the cached schema (None to disable)
+            workers=data.workers,  # Number of tables filled at the same time
+            processes=data.processes,  # Number of processes generating values
+            generator_module=data.__name__,  # Module the generator processes read `fields` from
+            async_driver=data.async_driver,  # asyncio driver for the insert pipeline (None to disable)
+            async_connections=data.async_connections,  # Insert batches in flight with `async_driver`
+            sink=data.sink,  # How rows are written ("insert", "bulk", "load_data", "copy", "sql", "csv", ...)
+            load_data_chunk_rows=data.load_data_chunk_rows,  # Rows per LOAD DATA or COPY statement
+            output=data.output,  # Directory of the files written by the file sinks
+            compression=data.compression,  # Compression of the written files (None to disable)
+            schema_file=data.schema_file,  # Schema cache file to run without a database
+            foreign_distributions=data.foreign_distributions,  # Spread of children over parents per foreign key
+            value_pools=data.value_pools,  # Sample slow generators from pools generated ahead
+            pool_size=data.pool_size,  # Values generated ahead per pooled rule
+            pool_bytes=data.pool_bytes,  # Memory budget of the pools (None for no limit)
+            pool_remix=data.pool_remix,  # Share of pooled values generated anew
+            pool_threshold=data.pool_threshold,  # Seconds per call above which a rule is pooled
+            pool_dir=data.pool_dir,  # Directory the pools are saved to (None to disable)
+            seed=data.seed if arguments.seed is None else arguments.seed,  # Seed of a reproducible run (None for random)
+            row_range=arguments.row_range,  # Positions (start, end) of the rows to generate
+            state_file=data.state_file,  # Progress record of the run (None to disable)
+            resume=arguments.resume,  # Continue the run recorded in `state_file`
+            fast_load=data.fast_load,  # Turn off the server's FK and unique checks, check in bulk at the end
+            drop_indexes=data.drop_indexes,  # Drop secondary indexes while a table is filled (with `fast_load`)
+            metrics_file=data.metrics_file,  # JSON report of the run's measures (None to disable)
+            prometheus_file=data.prometheus_file,  # Prometheus text file updated during the run
+            profiler=arguments.profile or data.profiler,  # "cprofile" or "sampling" (None to disable)
+            profile_file=data.profile_file,  # File the profile is written to (None for the default)
+            headless=arguments.headless,  # Log the insertion rate instead of drawing the dashboard
         )
     except Exception as e:
         console.print_exception()
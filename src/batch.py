@@ -0,0 +1,73 @@
+class ColumnBatch:
+    """
+    The `ColumnBatch` class is a batch of rows kept as one list of values per column, the way
+    the columnar mode generates them. The sinks write it without building a dict per row: the
+    database sinks bind its rows as tuples and the Parquet sink takes its columns as they are.
+
+    Parameters:
+        - `names` (list): The names of the columns.
+        - `columns` (list of lists): The values of every column, in the order of `names`.
+    """
+
+    def __init__(self, names: list, columns: list) -> None:
+        self.names = names
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def items(self):
+        return zip(self.names, self.columns)
+
+    def tuples(self, names=None) -> list:
+        """
+        The function `tuples` returns the rows as tuples, of the columns `names` in that order,
+        every column by default.
+        """
+        if names is None or names == self.names:
+            return list(zip(*self.columns))
+        position = {name: index for index, name in enumerate(self.names)}
+        return list(zip(*(self.columns[position[name]] for name in names)))
+
+    def dicts(self) -> list[dict]:
+        """
+        The function `dicts` returns the rows as dicts, for the writers which need them.
+        """
+        return [dict(zip(self.names, values)) for values in zip(*self.columns)]
+
+    def row(self, index) -> dict:
+        return {name: column[index] for name, column in self.items()}
+
+    def slice(self, start, stop) -> "ColumnBatch":
+        return ColumnBatch(self.names, [column[start:stop] for column in self.columns])
+
+    def size(self) -> int:
+        """
+        The function `size` returns a rough size in bytes of the batch, counted like
+        `estimate_row_size` counts a row.
+        """
+        return sum(
+            sum(len(value) if isinstance(value, (str, bytes)) else 8 for value in column)
+            for column in self.columns
+        )
+
+
+def iter_rows(rows, names):
+    """
+    The function `iter_rows` yields the rows of a batch as tuples of the columns `names`,
+    whether the batch is a `ColumnBatch` or a list of dicts.
+    """
+    if isinstance(rows, ColumnBatch):
+        return iter(rows.tuples(names))
+    return (tuple(row.get(name) for name in names) for row in rows)
+
+
+def iter_columns(rows, names):
+    """
+    The function `iter_columns` yields the (name, values) pairs of the columns `names` of a
+    batch, whether the batch is a `ColumnBatch` or a list of dicts.
+    """
+    if isinstance(rows, ColumnBatch):
+        columns = dict(rows.items())
+        return ((name, columns.get(name, [None] * len(rows))) for name in names)
+    return ((name, [row.get(name) for row in rows]) for name in names)
@@ -0,0 +1,239 @@
+import contextlib
+import math
+import sys
+import threading
+import time
+
+import numpy
+import sqlalchemy
+
+MASK = 0xFFFFFFFFFFFFFFFF
+# Mixes the second hash of a value out of the same Python hash as the first
+SALT = 0x9E3779B97F4A7C15
+
+# Values checked against the database by one `IN (...)` query
+VERIFY_BATCH = 1000
+# Answers of the database kept before they're forgotten
+CACHE_SIZE = 1_000_000
+
+
+def mix(value):
+    """
+    The function `mix` is the finalizer of splitmix64, which spreads the bits of a 64 bit
+    integer. It takes a Python int or a numpy array of uint64 and gives the same results for
+    both, Python's `hash` of an integer being the integer itself.
+    """
+    if isinstance(value, numpy.ndarray):
+        value = (value ^ (value >> numpy.uint64(30))) * numpy.uint64(0xBF58476D1CE4E5B9)
+        value = (value ^ (value >> numpy.uint64(27))) * numpy.uint64(0x94D049BB133111EB)
+        return value ^ (value >> numpy.uint64(31))
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK
+    return value ^ (value >> 31)
+
+
+class BloomFilter:
+    """
+    The `BloomFilter` class answers whether a value may have been added to it, in a fixed
+    amount of memory. A value is set in `hashes` bits found by double hashing its Python hash,
+    so values that are equal in Python, such as 1 and 1.0, are the same value for the filter.
+    It never misses a value it was given, but answers yes for others at a rate that depends on
+    the bits per value. Python hashes strings with a key picked per process, so a filter is
+    only meaningful in the process that filled it.
+
+    Parameters:
+        - `bits` (int): The size of the filter in bits.
+        - `hashes` (int): The number of bits set for every value.
+    """
+
+    def __init__(self, bits: int, hashes: int) -> None:
+        self.bits = max(8, bits)
+        self.hashes = hashes
+        self.array = numpy.zeros(-(-self.bits // 8), dtype=numpy.uint8)
+
+    @classmethod
+    def for_values(cls, count: int, max_bytes: int) -> "BloomFilter":
+        """
+        The function `for_values` makes a filter of at most `max_bytes` bytes for `count`
+        values, with the number of hashes giving the fewest false positives. Filters aren't
+        made larger than ~20 bits per value, which is about one false positive in 10,000.
+        """
+        count = max(1, count)
+        bits = min(8 * max_bytes, 20 * count)
+        hashes = min(14, max(1, round(bits / count * math.log(2))))
+        return cls(bits, hashes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.array.nbytes
+
+    def positions(self, value) -> list:
+        value = hash(value) & MASK
+        first, second = mix(value), mix(value ^ SALT) | 1
+        # Wrapped to 64 bits, as numpy does in `update`
+        return [
+            ((first + index * second) & MASK) % self.bits for index in range(self.hashes)
+        ]
+
+    def add(self, value) -> None:
+        for position in self.positions(value):
+            self.array[position >> 3] |= 1 << (position & 7)
+
+    def update(self, values) -> None:
+        """
+        The function `update` adds many values at once, hashing them with numpy.
+        """
+        hashes = numpy.fromiter(map(hash, values), dtype=numpy.int64).view(numpy.uint64)
+        if not len(hashes):
+            return
+        first = mix(hashes)
+        second = mix(hashes ^ numpy.uint64(SALT)) | numpy.uint64(1)
+        bits = numpy.uint64(self.bits)
+        for index in range(self.hashes):
+            positions = (first + numpy.uint64(index) * second) % bits
+            numpy.bitwise_or.at(
+                self.array,
+                positions >> numpy.uint64(3),
+                numpy.uint8(1) << (positions & numpy.uint64(7)).astype(numpy.uint8),
+            )
+
+    def __contains__(self, value) -> bool:
+        array = self.array
+        return all(
+            array[position >> 3] >> (position & 7) & 1
+            for position in self.positions(value)
+        )
+
+
+class ExistenceFilter:
+    """
+    The `ExistenceFilter` class stands for the set of values of a unique column too large to
+    be kept in memory. The values already in the table are in a `BloomFilter`, and the values
+    inserted by the run are kept exactly until the table is committed. A value the filter may hold
+    is looked up in the table, so the answers are exact and only cost a query for the values
+    which collide in the filter. `check` looks up many values with batched `IN (...)` queries
+    and keeps the answers for the membership tests that follow.
+
+    It only supports `in`, `add` and `len`, the values themselves can't be listed.
+
+    Parameters:
+        - `engine` (Engine): The engine the collisions are looked up with.
+        - `table_name` (str): The table of the column.
+        - `column_name` (str): The unique column.
+        - `count` (int): The number of values the table holds.
+        - `max_bytes` (int): The memory budget of the Bloom filter.
+        - `metrics` (RunMetrics): Where the time spent in lookups is recorded, if anywhere.
+    """
+
+    def __init__(
+        self, engine, table_name, column_name, count: int, max_bytes: int, metrics=None
+    ) -> None:
+        self.engine = engine
+        self.table_name = table_name
+        self.column_name = column_name
+        self.count = count
+        self.metrics = metrics
+        # Room for the values inserted by the run, which are added when committed
+        self.filter = BloomFilter.for_values(int(count * 1.25), max_bytes)
+        # Values which aren't committed yet, the database can't tell about them
+        self.recent = set()
+        # value -> whether the table holds it, for the values found in the filter
+        self.known = {}
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.count + len(self.recent)
+
+    def size(self) -> int:
+        """
+        The function `size` returns the approximate memory used by the filter in bytes.
+        """
+        return (
+            self.filter.nbytes
+            + sys.getsizeof(self.recent)
+            + sum(map(sys.getsizeof, self.recent))
+            + sys.getsizeof(self.known)
+        )
+
+    def update(self, values) -> None:
+        """
+        The function `update` adds values read from the table to the filter.
+        """
+        self.filter.update(values)
+
+    def add(self, value) -> bool:
+        """
+        The function `add` records a value inserted into the column,
+        it returns whether the value is new to the filter.
+        """
+        with self.lock:
+            if value in self.recent:
+                return False
+            self.recent.add(value)
+            return True
+
+    def commit(self) -> None:
+        """
+        The function `commit` moves the inserted values into the Bloom filter once they're
+        committed, from then on they're looked up in the table like the others.
+        """
+        with self.lock:
+            if not self.recent:
+                return
+            self.filter.update(self.recent)
+            self.count += len(self.recent)
+            self.recent = set()
+            # A value found missing earlier may have been inserted since
+            self.known = {}
+
+    def __contains__(self, value) -> bool:
+        if value is None:
+            return False
+        if value in self.recent:
+            return True
+        if value not in self.filter:
+            return False
+        if (found := self.known.get(value)) is None:
+            self.check([value])
+            found = self.known.get(value, False)
+        return found
+
+    def check(self, values) -> None:
+        """
+        The function `check` looks up in the table the values found in the Bloom filter,
+        `VERIFY_BATCH` values per query, and keeps the answers for the tests that follow.
+        """
+        with self.lock:
+            candidates = list(
+                {
+                    value
+                    for value in values
+                    if value is not None
+                    and value not in self.recent
+                    and value not in self.known
+                    and value in self.filter
+                }
+            )
+        if not candidates:
+            return
+
+        column = sqlalchemy.column(self.column_name)
+        answers = dict.fromkeys(candidates, False)
+        started_at = time.perf_counter()
+        with self.metrics.stage("key_index") if self.metrics else contextlib.nullcontext():
+            with self.engine.connect() as connection:
+                for start in range(0, len(candidates), VERIFY_BATCH):
+                    statement = (
+                        sqlalchemy.select(column)
+                        .select_from(sqlalchemy.table(self.table_name))
+                        .where(column.in_(candidates[start : start + VERIFY_BATCH]))
+                    )
+                    for (value,) in connection.execute(statement):
+                        answers[value] = True
+        if self.metrics:
+            self.metrics.observe("verify", time.perf_counter() - started_at)
+
+        with self.lock:
+            if len(self.known) + len(answers) > CACHE_SIZE:
+                self.known = {}
+            self.known.update(answers)
@@ -0,0 +1,75 @@
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """
+    The `Checkpoint` class records the progress of a run in a JSON state file: the tables that
+    were filled completely and the number of rows committed so far in the others. It's written
+    after every commit, so a run that stops can be resumed from its last committed batch.
+
+    Parameters:
+        - `path` (str): The state file.
+        - `run` (dict): The settings of the run, a state written by a run with other settings
+          can't be resumed since its rows would be different.
+    """
+
+    def __init__(self, path: str, run: dict) -> None:
+        self.path = path
+        self.run = run
+        # table name -> {"rows": rows committed, "done": whether the table is filled}
+        self.tables = {}
+        self.lock = threading.Lock()
+
+    def load(self) -> None:
+        """
+        The function `load` reads the state of the interrupted run back.
+        """
+        if not os.path.exists(self.path):
+            raise ValueError(
+                f"I can't find the state file '{self.path}' to resume from, "
+                f"maybe the run was never started?"
+            )
+        with open(self.path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("run") != self.run:
+            raise ValueError(
+                f"The state file '{self.path}' was written by a run with other settings "
+                f"({state.get('run')}), I can't resume it with these ({self.run})."
+            )
+        self.tables = state.get("tables", {})
+
+    def rows(self, table_name) -> int:
+        return self.tables.get(table_name, {}).get("rows", 0)
+
+    def is_done(self, table_name) -> bool:
+        return self.tables.get(table_name, {}).get("done", False)
+
+    def commit(self, table_name, rows) -> None:
+        """
+        The function `commit` records `rows` more rows committed into a table.
+        """
+        with self.lock:
+            state = self.tables.setdefault(table_name, {"rows": 0, "done": False})
+            state["rows"] += rows
+            self.save()
+
+    def finish(self, table_name) -> None:
+        """
+        The function `finish` records a table as filled, it's skipped when resuming.
+        """
+        with self.lock:
+            self.tables.setdefault(table_name, {"rows": 0})["done"] = True
+            self.save()
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Written aside and moved in place so a crash can't leave half a state
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"run": self.run, "tables": self.tables}, f)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,138 @@
+import logging
+
+from sqlalchemy import and_, event, func, select
+from sqlalchemy.schema import CreateIndex
+
+logger = logging.getLogger(__name__)
+
+# Run on every connection of a fast load. DataForge fills the tables in dependency order
+# and keeps unique columns unique itself, so the server's checks only repeat its work
+SESSION_STATEMENTS = {
+    "mysql": (
+        "SET SESSION foreign_key_checks = 0",
+        "SET SESSION unique_checks = 0",
+    ),
+    "sqlite": ("PRAGMA foreign_keys = OFF",),
+}
+
+
+def relax_checks(engine) -> None:
+    """
+    The function `relax_checks` turns off the foreign key and unique checks on every
+    connection the engine opens from now on, with `SESSION_STATEMENTS`.
+    """
+    statements = SESSION_STATEMENTS.get(engine.dialect.name)
+    if statements is None:
+        logger.warning(
+            "I can't turn off the checks of %s for a session, only the indexes "
+            "are dropped in fast load mode",
+            engine.dialect.name,
+        )
+        return
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def droppable_indexes(table, key_columns) -> list:
+    """
+    The function `droppable_indexes` returns the secondary indexes of a table which can be
+    dropped while it's filled. Unique indexes are kept since they're constraints, and so are
+    the indexes starting with a column of a foreign key or referred to by one, which InnoDB
+    needs to check the foreign keys.
+    """
+    foreign_columns = {
+        element.parent.name
+        for constraint in table.foreign_key_constraints
+        for element in constraint.elements
+    }
+    return sorted(
+        (
+            index
+            for index in table.indexes
+            if not index.unique
+            and index.columns
+            and (first := list(index.columns)[0].name) not in foreign_columns
+            and (table.name, first) not in key_columns
+        ),
+        key=lambda index: index.name,
+    )
+
+
+def remove_indexes(engine, indexes) -> None:
+    """
+    The function `remove_indexes` drops indexes, logging the statements recreating them
+    in case the run is killed before `restore_indexes` is called.
+    """
+    with engine.begin() as connection:
+        for index in indexes:
+            logger.info(
+                "Dropping index %s until its table is filled, it's recreated with: %s",
+                index.name,
+                str(CreateIndex(index).compile(dialect=engine.dialect)).strip(),
+            )
+            index.drop(bind=connection)
+
+
+def restore_indexes(engine, indexes) -> None:
+    with engine.begin() as connection:
+        for index in indexes:
+            index.create(bind=connection)
+
+
+def find_integrity_errors(connection, table, unique_columns) -> list[str]:
+    """
+    The function `find_integrity_errors` checks a filled table with one query per constraint,
+    and returns a description of every foreign key referring to a missing row and of every
+    unique column holding the same value twice.
+    """
+    errors = []
+    for constraint in table.foreign_key_constraints:
+        parent = constraint.referred_table
+        if parent is table:
+            parent = table.alias("parent")
+        pairs = [
+            (element.parent, parent.columns[element.column.name])
+            for element in constraint.elements
+        ]
+        orphans = connection.execute(
+            select(func.count())
+            .select_from(
+                table.outerjoin(
+                    parent, and_(*(child == referred for child, referred in pairs))
+                )
+            )
+            .where(
+                and_(*(child.isnot(None) for child, _ in pairs)),
+                pairs[0][1].is_(None),
+            )
+        ).scalar()
+        if orphans:
+            errors.append(
+                f"{orphans} rows of '{table.name}' refer to missing rows of "
+                f"'{constraint.referred_table.name}' "
+                f"({', '.join(child.name for child, _ in pairs)})"
+            )
+
+    for column_name in unique_columns:
+        column = table.columns[column_name]
+        duplicates = (
+            select(column)
+            .where(column.isnot(None))
+            .group_by(column)
+            .having(func.count() > 1)
+            .subquery()
+        )
+        if count := connection.execute(
+            select(func.count()).select_from(duplicates)
+        ).scalar():
+            errors.append(
+                f"{count} values of '{table.name}.{column_name}' appear more than once"
+            )
+    return errors
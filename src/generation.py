@@ -0,0 +1,64 @@
+import importlib
+import os
+import random
+import time
+
+import numpy
+
+from .plan import generate_batch, generate_value
+from .seeding import seed_generators
+
+# The `fields` of the generator module, set in every worker process by `init_worker`
+worker_fields = None
+# The random generator of the vectorized generators in a worker process
+worker_rng = None
+# The `fake` of the generator module, reseeded for every column of a seeded run
+worker_fake = None
+
+
+def init_worker(module_name):
+    """
+    The function `init_worker` prepares a generator process. The generators defined in
+    `data.py` are lambdas which can't be sent to another process, so the worker imports
+    the module itself and looks the generators up by their position in `fields`.
+    """
+    global worker_fields, worker_rng, worker_fake
+
+    module = importlib.import_module(module_name)
+    worker_fields = module.fields
+    worker_fake = getattr(module, "fake", None)
+
+    # A forked worker starts with the parent's random state, so each worker
+    # gets a fresh seed to avoid generating the same values as its siblings
+    seed = int.from_bytes(os.urandom(8), "big")
+    random.seed(seed)
+    worker_rng = numpy.random.default_rng(seed)
+    if worker_fake is not None:
+        worker_fake.seed_instance(seed)
+
+
+def generate_columns(columns, count, seeds=None, timed=False):
+    """
+    The function `generate_columns` generates `count` values for each column, the columns
+    are given as (column name, rule index, truncate, length) tuples. The values are returned
+    per column, which is cheaper to send back than one dict per row. Rules having a `batch`
+    generator produce the whole column with it. `seeds` maps the column names to the seeds of
+    a seeded run, the generators are seeded with them before each column. When `timed`,
+    the seconds spent per column are returned along with the values.
+    """
+    values = {}
+    seconds = {}
+    for name, index, truncate, length in columns:
+        started_at = time.perf_counter()
+        rng = worker_rng
+        if seeds:
+            rng = seed_generators(seeds[name], worker_fake)
+        if batch := worker_fields[index].get("batch"):
+            values[name] = generate_batch(batch, rng, count, truncate, length)
+        else:
+            generator = worker_fields[index]["generator"]
+            values[name] = [
+                generate_value(generator, truncate, length) for _ in range(count)
+            ]
+        seconds[name] = time.perf_counter() - started_at
+    return (values, seconds) if timed else values
@@ -0,0 +1,255 @@
+import contextlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import sqlalchemy
+
+from .batch import ColumnBatch
+from .bloom import ExistenceFilter
+
+# Rows fetched at a time when a column is streamed into an `ExistenceFilter`
+STREAM_ROWS = 10_000
+
+
+class KeyIndex:
+    """
+    The `KeyIndex` class keeps the values of unique and referenced columns in memory for the
+    whole run. Every (table, column) pair is read from the database once, then kept up to date
+    with the values inserted by the populator, and shared by every table that needs it.
+    It's safe to use from the threads filling tables in parallel.
+
+    Parameters:
+        - `engine` (Engine): The engine used to read a column the first time it's requested. `None`
+          when the rows are written to files, every column then starts empty.
+        - `max_bytes` (int): The approximate memory budget of the index. When it's exceeded, the
+          least recently used columns are evicted whole and read again on their next use.
+          `None` disables eviction.
+        - `tracked` (set): The (table name, column name) pairs indexed from the first inserted
+          value without an engine, since there's no database to read them from later.
+        - `metrics` (RunMetrics): Where the time spent reading columns is recorded, if anywhere.
+        - `filter_bytes` (int): The memory a column only needed for uniqueness checks can use
+          as a set. Larger columns are streamed into an `ExistenceFilter` of that size instead.
+          `None` keeps every column as a set.
+    """
+
+    def __init__(
+        self,
+        engine,
+        max_bytes: int = None,
+        tracked: set = None,
+        metrics=None,
+        filter_bytes: int = None,
+    ) -> None:
+        self.engine = engine
+        self.metrics = metrics
+        self.filter_bytes = filter_bytes
+        # Evicted columns can't be read back without a database
+        self.max_bytes = max_bytes if engine is not None else None
+        self.tracked = tracked or set()
+
+        # (table name, column name) -> set of values or `ExistenceFilter`,
+        # in least recently used order
+        self.columns = OrderedDict()
+        self.sizes = {}
+        self.total_bytes = 0
+
+        # Columns of pinned tables hold values that may not be committed yet,
+        # so they are never evicted
+        self.pinned_tables = set()
+        self.lock = threading.RLock()
+
+    def get(self, table_name, column_name, exact: bool = True):
+        """
+        The function `get` returns the set of values of a column,
+        reading it from the database if it isn't indexed yet.
+
+        A column only used to test whether values are taken is asked for with `exact` set
+        to False, it may then be an `ExistenceFilter`, see `filter_bytes`. A filter asked for
+        with `exact` is replaced by the set of the values, since they have to be listed.
+        """
+        key = (table_name, column_name)
+        with self.lock:
+            values = self.columns.get(key)
+            if values is not None and (
+                not exact or not isinstance(values, ExistenceFilter)
+            ):
+                self.columns.move_to_end(key)
+                return values
+
+            if values is None:
+                values = self.load(table_name, column_name, exact)
+            else:
+                # The values inserted by the run may not be committed yet
+                values = self.load(table_name, column_name) | values.recent
+                self.total_bytes -= self.sizes.pop(key)
+            self.columns[key] = values
+            self.columns.move_to_end(key)
+            self.sizes[key] = self.measure(values)
+            self.total_bytes += self.sizes[key]
+            self.evict(keep=key)
+
+            return values
+
+    def measure(self, values) -> int:
+        if isinstance(values, ExistenceFilter):
+            return values.size()
+        return sys.getsizeof(values) + sum(map(sys.getsizeof, values))
+
+    def load(self, table_name, column_name, exact: bool = True):
+        """
+        The function `load` reads every value of a column from the database.
+        """
+        if self.engine is None:
+            return set()
+        if not exact and self.filter_bytes is not None:
+            return self.stream(table_name, column_name)
+
+        statement = sqlalchemy.select(sqlalchemy.column(column_name)).select_from(
+            sqlalchemy.table(table_name)
+        )
+        started_at = time.perf_counter()
+        with self.metrics.stage("key_index") if self.metrics else contextlib.nullcontext():
+            with self.engine.connect() as connection:
+                values = {row[0] for row in connection.execute(statement)}
+        if self.metrics:
+            self.metrics.observe("select", time.perf_counter() - started_at)
+        return values
+
+    def stream(self, table_name, column_name):
+        """
+        The function `stream` reads the values of a column with a server-side cursor,
+        `STREAM_ROWS` at a time, into a set while it fits in `filter_bytes`, and into an
+        `ExistenceFilter` from the first batch that doesn't fit.
+        """
+        column = sqlalchemy.column(column_name)
+        statement = (
+            sqlalchemy.select(column)
+            .select_from(sqlalchemy.table(table_name))
+            .where(column.isnot(None))
+        )
+        values = set()
+        size = sys.getsizeof(values)
+        started_at = time.perf_counter()
+        with self.metrics.stage("key_index") if self.metrics else contextlib.nullcontext():
+            with self.engine.connect() as connection:
+                result = connection.execution_options(
+                    stream_results=True, yield_per=STREAM_ROWS
+                ).execute(statement)
+                for rows in result.partitions():
+                    if isinstance(values, ExistenceFilter):
+                        values.update(row[0] for row in rows)
+                        continue
+                    for (value,) in rows:
+                        if value not in values:
+                            values.add(value)
+                            size += sys.getsizeof(value)
+                    if size + sys.getsizeof(values) > self.filter_bytes:
+                        values = self.make_filter(table_name, column_name, values)
+        if self.metrics:
+            self.metrics.observe("select", time.perf_counter() - started_at)
+        return values
+
+    def make_filter(self, table_name, column_name, values) -> ExistenceFilter:
+        column = sqlalchemy.column(column_name)
+        # Counted apart, the cursor streaming the column is still open
+        with self.engine.connect() as connection:
+            count = connection.execute(
+                sqlalchemy.select(sqlalchemy.func.count(column)).select_from(
+                    sqlalchemy.table(table_name)
+                )
+            ).scalar()
+        existence = ExistenceFilter(
+            self.engine,
+            table_name,
+            column_name,
+            count=max(count, len(values)),
+            max_bytes=self.filter_bytes,
+            metrics=self.metrics,
+        )
+        existence.update(values)
+        return existence
+
+    def add(self, table_name, column_name, value) -> None:
+        """
+        The function `add` records a value inserted into a column. Columns that aren't
+        indexed are skipped, they'll see the value when they are read from the database.
+        """
+        key = (table_name, column_name)
+        with self.lock:
+            if value is None:
+                return
+            if key not in self.columns:
+                if self.engine is not None or key not in self.tracked:
+                    return
+                self.columns[key] = set()
+                self.sizes[key] = sys.getsizeof(self.columns[key])
+                self.total_bytes += self.sizes[key]
+
+            values = self.columns[key]
+            if isinstance(values, ExistenceFilter):
+                added = values.add(value)
+            elif added := value not in values:
+                values.add(value)
+            if added:
+                size = sys.getsizeof(value)
+                self.sizes[key] += size
+                self.total_bytes += size
+
+    def add_rows(self, table_name, rows) -> None:
+        """
+        The function `add_rows` records every value of a batch of inserted rows.
+        """
+        with self.lock:
+            if isinstance(rows, ColumnBatch):
+                for column_name, values in rows.items():
+                    key = (table_name, column_name)
+                    # Checked once for the whole column, like `add` does for a value
+                    if key in self.columns or (
+                        self.engine is None and key in self.tracked
+                    ):
+                        for value in values:
+                            self.add(table_name, column_name, value)
+                self.evict()
+                return
+            for row in rows:
+                for column_name, value in row.items():
+                    self.add(table_name, column_name, value)
+            self.evict()
+
+    def pin(self, table_name) -> None:
+        with self.lock:
+            self.pinned_tables.add(table_name)
+
+    def unpin(self, table_name) -> None:
+        """
+        The function `unpin` is called once the rows of a table are committed,
+        the values its filters kept exactly are moved into their Bloom filters.
+        """
+        with self.lock:
+            self.pinned_tables.discard(table_name)
+            for key, values in self.columns.items():
+                if key[0] == table_name and isinstance(values, ExistenceFilter):
+                    values.commit()
+                    self.total_bytes += values.size() - self.sizes[key]
+                    self.sizes[key] = values.size()
+            self.evict()
+
+    def evict(self, keep=None) -> None:
+        """
+        The function `evict` drops the least recently used columns until
+        the index fits in `max_bytes` again.
+        """
+        if self.max_bytes is None:
+            return
+
+        with self.lock:
+            for key in list(self.columns):
+                if self.total_bytes <= self.max_bytes:
+                    break
+                if key == keep or key[0] in self.pinned_tables:
+                    continue
+
+                del self.columns[key]
+                self.total_bytes -= self.sizes.pop(key)
@@ -0,0 +1,358 @@
+import bisect
+import contextlib
+import cProfile
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the buckets of the latency histograms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+    """
+    The `Histogram` class counts observed durations in the buckets of `LATENCY_BUCKETS`,
+    the way Prometheus histograms do.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        # One count per bucket, and a last one for the durations above every bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self) -> list:
+        """
+        The function `cumulative` returns (upper bound, durations up to it) pairs,
+        the last bound being "+Inf".
+        """
+        total, pairs = 0, []
+        for bound, count in zip((*map(str, self.buckets), "+Inf"), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class RunMetrics:
+    """
+    The `RunMetrics` class collects the measures of a run: the time spent in each stage, the
+    cost of every column's generator, the retries needed to find unique values, the latency
+    of the database round trips and the rows written per table. It's safe to use from the
+    threads filling tables in parallel.
+
+    Stages can run inside each other, a stage is paused while a nested one runs in the same
+    thread, so the time of a stage never includes the time of another.
+    """
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.lock = threading.Lock()
+        # Running stages of every thread, as [stage name, time it started or resumed]
+        self.local = threading.local()
+
+        self.stages = defaultdict(float)
+        # (table name, column name) -> [calls, seconds]
+        self.columns = defaultdict(lambda: [0, 0.0])
+        # (table name, column name) -> values generated again because they were taken
+        self.retries = Counter()
+        # operation -> Histogram of its round trips to the database
+        self.latency = defaultdict(Histogram)
+        # table name -> [rows, time it started, time it finished]
+        self.tables = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        stack = self.local.__dict__.setdefault("stack", [])
+        now = time.perf_counter()
+        if stack:
+            self.add_stage(stack[-1], now)
+        stack.append([name, now])
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self.add_stage(stack.pop(), now)
+            if stack:
+                stack[-1][1] = now
+
+    def add_stage(self, entry, now) -> None:
+        with self.lock:
+            self.stages[entry[0]] += now - entry[1]
+        entry[1] = now
+
+    def timed_iter(self, name, iterator):
+        """
+        The function `timed_iter` yields the items of `iterator`, the time spent
+        producing them is added to the stage `name`.
+        """
+        while True:
+            with self.stage(name):
+                item = next(iterator, StopIteration)
+            if item is StopIteration:
+                return
+            yield item
+
+    def column_cost(self, table_name, column_name, calls, seconds) -> None:
+        with self.lock:
+            cost = self.columns[(table_name, column_name)]
+            cost[0] += calls
+            cost[1] += seconds
+
+    def retry(self, table_name, column_name, count=1) -> None:
+        with self.lock:
+            self.retries[(table_name, column_name)] += count
+
+    def observe(self, operation, seconds) -> None:
+        with self.lock:
+            self.latency[operation].observe(seconds)
+
+    def table_started(self, table_name) -> None:
+        with self.lock:
+            self.tables[table_name] = [0, time.perf_counter(), None]
+
+    def table_rows(self, table_name, rows) -> None:
+        with self.lock:
+            self.tables[table_name][0] += rows
+
+    def table_finished(self, table_name) -> None:
+        with self.lock:
+            self.tables[table_name][2] = time.perf_counter()
+
+    def report(self) -> dict:
+        """
+        The function `report` returns every measure as a dict, ready to be written as JSON.
+        """
+        now = time.perf_counter()
+        with self.lock:
+            elapsed = now - self.started_at
+            rows = sum(rows for rows, _, _ in self.tables.values())
+            return {
+                "seconds": round(elapsed, 4),
+                "rows": rows,
+                "rows_per_second": round(rows / max(elapsed, 1e-9), 1),
+                "stages": {
+                    name: round(seconds, 4)
+                    for name, seconds in sorted(
+                        self.stages.items(), key=lambda item: -item[1]
+                    )
+                },
+                "tables": {
+                    name: {
+                        "rows": rows,
+                        "seconds": round((finished or now) - started, 4),
+                        "rows_per_second": round(
+                            rows / max((finished or now) - started, 1e-9), 1
+                        ),
+                    }
+                    for name, (rows, started, finished) in self.tables.items()
+                },
+                "columns": {
+                    f"{table_name}.{column_name}": {
+                        "calls": calls,
+                        "seconds": round(seconds, 4),
+                        "us_per_call": round(seconds / max(calls, 1) * 1e6, 2),
+                    }
+                    for (table_name, column_name), (calls, seconds) in sorted(
+                        self.columns.items(), key=lambda item: -item[1][1]
+                    )
+                },
+                "retries": {
+                    f"{table_name}.{column_name}": count
+                    for (table_name, column_name), count in self.retries.most_common()
+                },
+                "latency": {
+                    operation: {
+                        "count": histogram.count,
+                        "seconds": round(histogram.sum, 4),
+                        "buckets": dict(histogram.cumulative()),
+                    }
+                    for operation, histogram in self.latency.items()
+                },
+            }
+
+    def write_report(self, path) -> None:
+        write_file(path, json.dumps(self.report(), indent=2))
+
+    def write_prometheus(self, path) -> None:
+        """
+        The function `write_prometheus` writes the measures in the Prometheus text format,
+        for the textfile collector of the node exporter.
+        """
+        lines = []
+
+        def metric(name, kind, description, samples):
+            lines.append(f"# HELP dataforge_{name} {description}")
+            lines.append(f"# TYPE dataforge_{name} {kind}")
+            for labels, value in samples:
+                text = ",".join(f'{key}="{escape(label)}"' for key, label in labels.items())
+                lines.append(f"dataforge_{name}{{{text}}} {value}")
+
+        with self.lock:
+            metric(
+                "rows_total",
+                "counter",
+                "Rows written per table.",
+                [({"table": name}, rows) for name, (rows, _, _) in self.tables.items()],
+            )
+            metric(
+                "stage_seconds_total",
+                "counter",
+                "Time spent per stage of the run.",
+                [({"stage": name}, seconds) for name, seconds in self.stages.items()],
+            )
+            metric(
+                "generator_calls_total",
+                "counter",
+                "Calls of the generator of a column.",
+                [
+                    ({"table": table_name, "column": column_name}, calls)
+                    for (table_name, column_name), (calls, _) in self.columns.items()
+                ],
+            )
+            metric(
+                "generator_seconds_total",
+                "counter",
+                "Time spent in the generator of a column.",
+                [
+                    ({"table": table_name, "column": column_name}, seconds)
+                    for (table_name, column_name), (_, seconds) in self.columns.items()
+                ],
+            )
+            metric(
+                "unique_retries_total",
+                "counter",
+                "Values generated again because they were taken.",
+                [
+                    ({"table": table_name, "column": column_name}, count)
+                    for (table_name, column_name), count in self.retries.items()
+                ],
+            )
+            lines.append("# HELP dataforge_db_latency_seconds Database round trips.")
+            lines.append("# TYPE dataforge_db_latency_seconds histogram")
+            for operation, histogram in self.latency.items():
+                for bound, count in histogram.cumulative():
+                    lines.append(
+                        f'dataforge_db_latency_seconds_bucket{{operation="{operation}",'
+                        f'le="{bound}"}} {count}'
+                    )
+                lines.append(
+                    f'dataforge_db_latency_seconds_sum{{operation="{operation}"}} '
+                    f"{histogram.sum}"
+                )
+                lines.append(
+                    f'dataforge_db_latency_seconds_count{{operation="{operation}"}} '
+                    f"{histogram.count}"
+                )
+        write_file(path, "\n".join(lines) + "\n")
+
+
+class Profiler:
+    """
+    The `Profiler` class profiles a run, `cprofile` with Python's deterministic profiler, or
+    `sampling` with a thread taking the stacks of every thread every `interval` seconds. The
+    first writes a pstats file, the second collapsed stacks which flame graph tools such as
+    speedscope or flamegraph.pl read.
+
+    Parameters:
+        - `kind` (str): `cprofile` or `sampling`.
+        - `path` (str): The file the profile is written to.
+        - `interval` (float): The seconds between two samples of the sampling profiler.
+    """
+
+    def __init__(self, kind: str, path: str, interval: float = 0.005) -> None:
+        if kind not in ("cprofile", "sampling"):
+            raise ValueError(
+                f"I don't know the profiler '{kind}', it can be 'cprofile' or 'sampling'."
+            )
+        self.kind = kind
+        self.path = path
+        self.interval = interval
+        self.profiles = []
+        self.samples = Counter()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.sampler = None
+
+    def start(self) -> None:
+        if self.kind == "sampling":
+            self.sampler = threading.Thread(target=self.sample, daemon=True)
+            self.sampler.start()
+
+    @contextlib.contextmanager
+    def thread(self):
+        """
+        The function `thread` profiles the code it wraps with `cprofile`, which only sees the
+        thread it's enabled in, so every thread doing work wraps its work with it.
+        """
+        if self.kind != "cprofile":
+            yield
+            return
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self.lock:
+                self.profiles.append(profile)
+
+    def sample(self) -> None:
+        own_id = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+                        f"{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        """
+        The function `stop` ends the profile and writes it to `path`.
+        """
+        self.stopped.set()
+        if self.sampler is not None:
+            self.sampler.join()
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self.kind == "sampling":
+            write_file(
+                self.path,
+                "".join(f"{stack} {count}\n" for stack, count in self.samples.items()),
+            )
+        elif self.profiles:
+            stats = pstats.Stats(*self.profiles)
+            stats.dump_stats(self.path)
+        logger.info("Profile written to %s", self.path)
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def write_file(path, content) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Written aside and moved in place, readers never see half a file
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(temp_path, path)
@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+from .batch import ColumnBatch
+
+
+class AsyncInsertPipeline:
+    """
+    The `AsyncInsertPipeline` class inserts batches through an asyncio engine while the next
+    batches are being generated. Generation runs in a thread and feeds a bounded queue, and a
+    few connections each keep one insert batch in flight.
+
+    Parameters:
+        - `url` (URL): The database URL with an async driver, e.g. `mysql+aiomysql://...`.
+        - `connections` (int): The number of batches inserted at the same time.
+        - `queue_size` (int): The number of generated batches waiting to be inserted. Generation
+          pauses when the queue is full, so memory stays bounded when the database is the bottleneck.
+        - `prepare_engine` (callable): Called with the synchronous engine behind every asyncio
+          engine before it connects, e.g. to listen to its events.
+    """
+
+    def __init__(
+        self, url, connections: int = 4, queue_size: int = 8, prepare_engine=None
+    ) -> None:
+        self.url = url
+        self.connections = max(1, connections)
+        self.queue_size = max(1, queue_size)
+        self.prepare_engine = prepare_engine
+
+    def insert(self, batches, statement, on_commit) -> None:
+        """
+        The function `insert` consumes the `batches` iterator and inserts every batch with
+        `statement`, calling `on_commit` with each batch and the seconds its insert took once
+        it's committed. The first error stops generation and the other inserts, and is raised
+        again here.
+        """
+        try:
+            asyncio.run(self.run(batches, statement, on_commit))
+        except ExceptionGroup as errors:
+            raise errors.exceptions[0]
+
+    async def run(self, batches, statement, on_commit) -> None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        # The engine's connections belong to the event loop of this run, so every run
+        # gets its own engine, a table filled per thread gets its own loop. Each
+        # consumer holds at most one connection, which bounds the pool
+        engine = create_async_engine(self.url)
+        if self.prepare_engine is not None:
+            self.prepare_engine(engine.sync_engine)
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(self.produce(batches, queue))
+                for _ in range(self.connections):
+                    group.create_task(self.consume(engine, queue, statement, on_commit))
+        finally:
+            await engine.dispose()
+
+    async def produce(self, batches, queue) -> None:
+        """
+        The function `produce` generates the batches in a thread, so the event loop keeps
+        driving the inserts meanwhile, and ends the queue with one marker per connection.
+        """
+        done = object()
+        while (batch := await asyncio.to_thread(next, batches, done)) is not done:
+            await queue.put(batch)
+        for _ in range(self.connections):
+            await queue.put(None)
+
+    async def consume(self, engine, queue, statement, on_commit) -> None:
+        while (batch := await queue.get()) is not None:
+            started_at = time.perf_counter()
+            # The asyncio engine binds dicts, they're built off the event loop
+            rows = batch
+            if isinstance(batch, ColumnBatch):
+                rows = await asyncio.to_thread(batch.dicts)
+            async with engine.begin() as connection:
+                await connection.execute(statement, rows)
+            on_commit(batch, time.perf_counter() - started_at)
@@ -0,0 +1,147 @@
+import re
+
+from .enums import Nothing
+
+Nada = Nothing.Nada.value
+
+
+class FieldRule:
+    """
+    A single entry of `special_fields` or `special_foreign_fields` with its `name` and
+    `type` patterns compiled once, so matching a column doesn't compile them again.
+
+    Parameters:
+        - `field` (dict): The rule as defined in `data.py`.
+        - `index` (int): The position of the rule in its list, used when reporting matches.
+    """
+
+    def __init__(self, field: dict, index: int) -> None:
+        self.field = field
+        self.index = index
+        self.table = field.get("table")
+        self.generator = field["generator"]
+        # Optional vectorized generator producing a whole column at once, see `vectorized`
+        self.batch = field.get("batch")
+        self.name = self.compile(field.get("name"))
+        self.type = self.compile(field.get("type"))
+
+    @staticmethod
+    def compile(pattern):
+        """
+        The function `compile` compiles a pattern case insensitively. Patterns that aren't
+        valid regexes are matched as plain substrings.
+        """
+        if not pattern:
+            return None
+        try:
+            return re.compile(pattern, re.IGNORECASE)
+        except re.error:
+            return re.compile(re.escape(pattern), re.IGNORECASE)
+
+    def matches(self, column, table_name) -> bool:
+        """
+        The function `matches` checks whether the rule applies to a column, a rule needs
+        at least a name or a type, and every pattern it gives has to match.
+        """
+        if not (self.name or self.type):
+            return False
+        if self.table and self.table != table_name:
+            return False
+        if self.type and not self.type.search(str(column.type)):
+            return False
+        return not self.name or bool(self.name.search(str(column.name)))
+
+    def describe(self) -> str:
+        return (
+            f"#{self.index} (name={self.field.get('name')!r}, "
+            f"type={self.field.get('type')!r}, table={self.table!r})"
+        )
+
+
+class ColumnPlan:
+    """
+    The generator chosen for a column, together with the truncation length
+    of the column so that producing a value is a single call.
+
+    Parameters:
+        - `column` (Column): The reflected column.
+        - `rule` (FieldRule): The first rule matching the column, or None if no rule matched.
+    """
+
+    def __init__(self, column, rule: FieldRule = None) -> None:
+        self.column = column
+        self.rule = rule
+        self.generator = rule.generator if rule else Nada
+        self.batch = rule.batch if rule else None
+        # A `ValuePool` to sample instead of calling the generator, see `pools`
+        self.pool = None
+        # Only types with a `length` attribute truncate, even if the length is None
+        self.truncate = hasattr(column.type, "length")
+        self.length = getattr(column.type, "length", None)
+
+    def generate(self):
+        """
+        The function `generate` returns a new value for the column,
+        or `Nada` if no rule matched the column.
+        """
+        if self.rule is None:
+            return Nada
+        if self.pool is not None:
+            return truncate_value(self.pool.sample(), self.truncate, self.length)
+        return generate_value(self.generator, self.truncate, self.length)
+
+    def generate_batch(self, rng, count) -> list:
+        """
+        The function `generate_batch` returns `count` values for the column from the
+        vectorized generator of its rule, truncated like `generate` does.
+        """
+        return generate_batch(self.batch, rng, count, self.truncate, self.length)
+
+    def describe(self) -> str:
+        return self.rule.describe() if self.rule else "no matching rule"
+
+
+def generate_value(generator, truncate, length):
+    """
+    The function `generate_value` calls a generator and truncates the value to
+    the column's length when the column type has one.
+    """
+    # If the generator is a function, call it and return the result
+    value = generator() if callable(generator) else generator
+    return truncate_value(value, truncate, length)
+
+
+def truncate_value(value, truncate, length):
+    # If the value is a string or int, truncate it to the column's length
+    if truncate and type(value) in (str, int):
+        return str(value)[:length]
+    return value
+
+
+def generate_batch(batch, rng, count, truncate, length) -> list:
+    """
+    The function `generate_batch` calls a vectorized generator and truncates
+    the values to the column's length when the column type has one.
+    """
+    values = batch(rng, count)
+    if truncate and values and type(values[0]) in (str, int):
+        return [str(value)[:length] for value in values]
+    return values
+
+
+def compile_rules(fields: list[dict]) -> list[FieldRule]:
+    """
+    The function `compile_rules` compiles every rule of `special_fields`
+    or `special_foreign_fields` in order.
+    """
+    return [FieldRule(field, index) for index, field in enumerate(fields or [])]
+
+
+def resolve_column(column, table_name, rules: list[FieldRule]) -> ColumnPlan:
+    """
+    The function `resolve_column` binds a column to the first rule matching it.
+    """
+    for rule in rules:
+        if rule.matches(column, table_name):
+            return ColumnPlan(column, rule)
+    return ColumnPlan(column)
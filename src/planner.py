@@ -0,0 +1,403 @@
+import heapq
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The most tables `TopologicalOrder.add` looks at on a side to add a foreign key which can
+# be deferred back into a component
+SEARCH_LIMIT = 32
+
+
+class TablePlan:
+    """
+    The `TablePlan` class is the order in which the tables of a run are filled, made by
+    `plan_tables`.
+
+    Parameters:
+        - `order` (list): Every table, each one after the tables it waits for.
+        - `levels` (list of lists): The tables grouped by depth, the tables of a level only
+          wait for tables of the levels before it, so they can be filled at the same time.
+        - `parents` (dict): The tables every table waits for.
+        - `deferred` (dict): The foreign key columns of every table which are left NULL while
+          the table is filled and filled by an UPDATE pass once every table is, to break
+          the cycles between tables.
+        - `broken` (list): The (table, parent) foreign keys of cycles which couldn't be deferred,
+          since a column isn't nullable. The table draws from the rows the parent already holds.
+    """
+
+    def __init__(self, order, levels, parents, deferred, broken) -> None:
+        self.order = order
+        self.levels = levels
+        self.parents = parents
+        self.deferred = deferred
+        self.broken = broken
+
+
+def strongly_connected(nodes, edges) -> list[list]:
+    """
+    The function `strongly_connected` returns the strongly connected components of the graph
+    made of `nodes` and the `edges` between them, with Tarjan's algorithm. `edges` maps a node
+    to the nodes it points to. It keeps its own stack, so long paths don't hit the recursion
+    limit.
+    """
+    members = set(nodes)
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        # (node, iterator over the nodes it points to) of the nodes being visited
+        path = [(root, iter(edges[root]))]
+        while path:
+            node, targets = path[-1]
+            for target in targets:
+                if target not in members:
+                    continue
+                if target not in index:
+                    index[target] = lowlink[target] = len(index)
+                    stack.append(target)
+                    on_stack.add(target)
+                    path.append((target, iter(edges[target])))
+                    break
+                if target in on_stack:
+                    lowlink[node] = min(lowlink[node], index[target])
+            else:
+                path.pop()
+                if path:
+                    parent = path[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def deferrable_columns(table) -> set:
+    """
+    The function `deferrable_columns` returns the columns of a table which can be left NULL
+    and filled later, which needs nullable columns and a single column primary key to find
+    the rows by.
+    """
+    if len(table.primary_key.columns) != 1:
+        return set()
+    return {column.name for column in table.columns if column.nullable}
+
+
+class TopologicalOrder:
+    """
+    The `TopologicalOrder` class is an acyclic graph kept in topological order while edges
+    are added to it, with the dynamic topological sort of Pearce and Kelly: an edge going
+    backwards in the order only visits and moves the nodes between its two ends.
+
+    Parameters:
+        - `order` (list): The nodes, numbered from 0, in the order they start in.
+    """
+
+    def __init__(self, order: list) -> None:
+        self.position = [0] * len(order)
+        for place, node in enumerate(order):
+            self.position[node] = place
+        self.children = [[] for _ in order]
+        self.parents = [[] for _ in order]
+        # The nodes seen by the current search, `stamp` forward and `-stamp` backward
+        self.marks = [0] * len(order)
+        self.stamp = 0
+
+    def add(self, parent, child, limit=SEARCH_LIMIT) -> bool:
+        """
+        The function `add` adds the edge `parent` -> `child` unless it would close a cycle,
+        and returns whether it did. It gives up, without adding the edge, when it would visit
+        more than `limit` nodes on a side, or never with a `limit` of None.
+        """
+        position, marks = self.position, self.marks
+        lower, upper = position[child], position[parent]
+        if lower < upper:
+            # The nodes the child leads to which are placed before the parent, and the nodes
+            # leading to the parent which are placed after the child. They're searched in
+            # turns, the edge closes a cycle as soon as the two searches meet
+            self.stamp += 1
+            stamp = self.stamp
+            marks[child], marks[parent] = stamp, -stamp
+            forward, forward_stack = [child], [child]
+            backward, backward_stack = [parent], [parent]
+            while forward_stack or backward_stack:
+                if forward_stack:
+                    for target in self.children[forward_stack.pop()]:
+                        if marks[target] == -stamp:
+                            return False
+                        if marks[target] != stamp and position[target] < upper:
+                            marks[target] = stamp
+                            forward.append(target)
+                            forward_stack.append(target)
+                if backward_stack:
+                    for source in self.parents[backward_stack.pop()]:
+                        if marks[source] == stamp:
+                            return False
+                        if marks[source] != -stamp and position[source] > lower:
+                            marks[source] = -stamp
+                            backward.append(source)
+                            backward_stack.append(source)
+                if limit is not None and max(len(forward), len(backward)) > limit:
+                    return False
+            # Both groups take the same positions, the parent's side first
+            backward.sort(key=position.__getitem__)
+            forward.sort(key=position.__getitem__)
+            moved = backward + forward
+            for node, place in zip(moved, sorted([position[node] for node in moved])):
+                position[node] = place
+        self.children[parent].append(child)
+        self.parents[child].append(parent)
+        return True
+
+
+def order_component(component, edges, deferrable, rows) -> list:
+    """
+    The function `order_component` breaks the cycles of a strongly connected component, it
+    returns the (table, parent) foreign keys to drop so that the others make no cycle.
+
+    The tables are first put in a single order with the heuristic of Eades, Lin and Smyth:
+    tables nothing refers to anymore go to the end, tables referring to nothing anymore to
+    the start, and otherwise the table whose foreign keys to the others are the most expensive
+    to drop compared to the ones referring to it goes to the start. Foreign keys which can't be
+    deferred weigh more than any cost, and the order is sorted again along them with
+    `sort_along`. A table with such foreign keys, from or to it, is a source or a sink by
+    those keys alone. The foreign keys are then added from the most expensive to drop into a
+    `TopologicalOrder`, which only moves tables for the keys going backwards in it. The search
+    of a key which can be deferred gives up after `SEARCH_LIMIT` tables, so those cost
+    O(E log E + E * SEARCH_LIMIT), the others are only dropped when they close a cycle.
+
+    Parameters:
+        - `component` (list): The tables of the component.
+        - `edges` (dict): {parent table name: foreign key columns} by table name.
+        - `deferrable` (dict): The `deferrable_columns` of every table of the component.
+        - `rows` (dict): The number of rows generated in every table.
+    """
+    # The tables are numbered by their index in the component from here on
+    index = {name: node for node, name in enumerate(component)}
+    count = len(component)
+    # (table, parent, 1 for a foreign key which can't be deferred else 0,
+    # rows to update if it's deferred)
+    keys = []
+    for node, name in enumerate(component):
+        for parent, column_names in edges[name].items():
+            if (other := index.get(parent)) is not None:
+                if deferrable[name].issuperset(column_names):
+                    keys.append((node, other, 0, rows.get(name, 0) * len(column_names)))
+                else:
+                    keys.append((node, other, 1, 0))
+
+    # The tables with foreign keys which can't be deferred
+    strict = [False] * count
+    for node, parent, not_null, _ in keys:
+        if not_null:
+            strict[node] = strict[parent] = True
+
+    # The foreign keys of every table to the tables left and to it from them, the number of
+    # them deciding sources and sinks, and the weights of the ones to it less the weights of
+    # the ones from it
+    children = [[] for _ in range(count)]
+    parents = [[] for _ in range(count)]
+    count_in = [0] * count
+    count_out = [0] * count
+    not_null_balance = [0] * count
+    cost_balance = [0] * count
+    for key in keys:
+        node, parent, not_null, cost = key
+        children[parent].append(key)
+        parents[node].append(key)
+        if not_null or not strict[node]:
+            count_in[node] += 1
+        if not_null or not strict[parent]:
+            count_out[parent] += 1
+        not_null_balance[node] += not_null
+        not_null_balance[parent] -= not_null
+        cost_balance[node] += cost
+        cost_balance[parent] -= cost
+
+    heap = [(not_null_balance[node], cost_balance[node], node) for node in range(count)]
+    heapq.heapify(heap)
+    sources = [node for node in range(count) if not count_in[node]]
+    sinks = [node for node in range(count) if not count_out[node]]
+    start, end = [], []
+    left = [True] * count
+
+    def remove(node):
+        left[node] = False
+        for _, parent, not_null, cost in parents[node]:
+            if left[parent]:
+                not_null_balance[parent] += not_null
+                cost_balance[parent] += cost
+                if not_null or not strict[parent]:
+                    count_out[parent] -= 1
+                    if not count_out[parent]:
+                        sinks.append(parent)
+                heapq.heappush(
+                    heap, (not_null_balance[parent], cost_balance[parent], parent)
+                )
+        for child, _, not_null, cost in children[node]:
+            if left[child]:
+                not_null_balance[child] -= not_null
+                cost_balance[child] -= cost
+                if not_null or not strict[child]:
+                    count_in[child] -= 1
+                    if not count_in[child]:
+                        sources.append(child)
+                heapq.heappush(
+                    heap, (not_null_balance[child], cost_balance[child], child)
+                )
+
+    while len(start) + len(end) < count:
+        if sinks:
+            if left[node := sinks.pop()]:
+                end.append(node)
+                remove(node)
+        elif sources:
+            if left[node := sources.pop()]:
+                start.append(node)
+                remove(node)
+        else:
+            balance, cost, node = heapq.heappop(heap)
+            # Entries left behind when the weights of a table changed
+            if (
+                left[node]
+                and balance == not_null_balance[node]
+                and cost == cost_balance[node]
+            ):
+                start.append(node)
+                remove(node)
+
+    # The order is only a heuristic, starting from it the foreign keys are kept from the most
+    # expensive to drop to the cheapest while they make no cycle. The ones which can be
+    # deferred look at `SEARCH_LIMIT` tables at most so that large components stay fast,
+    # the others are only dropped when they really close a cycle
+    graph = TopologicalOrder(sort_along(start + end[::-1], keys))
+    dropped = []
+    # Among keys as expensive to drop, the ones going forward in the order need no search
+    position = graph.position[:]
+    for node, parent, not_null, cost in sorted(
+        keys, key=lambda key: (-key[2], -key[3], position[key[1]] - position[key[0]], key)
+    ):
+        if not graph.add(parent, node, limit=None if not_null else SEARCH_LIMIT):
+            dropped.append((component[node], component[parent]))
+    return sorted(dropped)
+
+
+def sort_along(order, keys) -> list:
+    """
+    The function `sort_along` sorts the tables of `order` again so that no foreign key which
+    can't be deferred goes backwards, unless they make a cycle on their own, moving the tables
+    as little as possible: the next table is always the first one in `order` whose foreign
+    keys of this kind all point to tables already placed, or the first one left otherwise.
+    The tables are numbered from 0, and `keys` are the (table, parent, not null, cost)
+    foreign keys of `order_component`.
+    """
+    position = [0] * len(order)
+    for place, node in enumerate(order):
+        position[node] = place
+    waiting = [0] * len(order)
+    children = [[] for _ in order]
+    for node, parent, not_null, _ in keys:
+        if not_null:
+            waiting[node] += 1
+            children[parent].append(node)
+
+    ready = [position[node] for node in order if not waiting[node]]
+    heapq.heapify(ready)
+    placed = [False] * len(order)
+    sorted_order = []
+    # Positions of the tables left, to pick the first one when none is ready
+    pending = 0
+    while len(sorted_order) < len(order):
+        if ready:
+            node = order[heapq.heappop(ready)]
+            if placed[node]:
+                continue
+        else:
+            while placed[order[pending]]:
+                pending += 1
+            node = order[pending]
+        placed[node] = True
+        sorted_order.append(node)
+        for child in children[node]:
+            waiting[child] -= 1
+            if not waiting[child] and not placed[child]:
+                heapq.heappush(ready, position[child])
+    return sorted_order
+
+
+def plan_tables(tables, foreign_columns, rows) -> TablePlan:
+    """
+    The function `plan_tables` orders the tables of a run so that every table is filled after
+    the tables it refers to. The graph of the foreign keys is made in a single pass and split
+    in strongly connected components, the groups of tables referring to each other in cycles.
+    The cycles of each one are broken by `order_component`, which drops the foreign keys that
+    are the cheapest to defer. Deferring costs an UPDATE per row, the nullable foreign keys of
+    the tables with the fewest rows are the cheapest, the ones which can't be deferred are
+    dropped last.
+
+    Parameters:
+        - `tables` (dict): The tables of the run by name.
+        - `foreign_columns` (dict): {column name: (referred column, referred table)} by table name.
+        - `rows` (dict): The number of rows generated in every table.
+    """
+    names = sorted(tables)
+    # table name -> {parent table name: the foreign key columns referring to it}, a table
+    # referring to itself or to a table the run doesn't fill doesn't wait for anything
+    edges = {name: {} for name in names}
+    for name in names:
+        for column_name, (_, parent) in foreign_columns.get(name, {}).items():
+            if parent != name and parent in tables:
+                edges[name].setdefault(parent, []).append(column_name)
+
+    deferred = {}
+    broken = []
+    for component in strongly_connected(names, edges):
+        if len(component) < 2:
+            continue
+        deferrable = {name: deferrable_columns(tables[name]) for name in component}
+        for name, parent in order_component(component, edges, deferrable, rows):
+            column_names = edges[name].pop(parent)
+            if deferrable[name].issuperset(column_names):
+                deferred.setdefault(name, []).extend(column_names)
+            else:
+                broken.append((name, parent))
+
+    children = {name: [] for name in names}
+    waiting = {}
+    for name in names:
+        waiting[name] = len(edges[name])
+        for parent in edges[name]:
+            children[parent].append(name)
+
+    levels = []
+    level = [name for name in names if not waiting[name]]
+    while level:
+        levels.append(level)
+        next_level = []
+        for name in level:
+            for child in children[name]:
+                waiting[child] -= 1
+                if not waiting[child]:
+                    next_level.append(child)
+        level = sorted(next_level)
+
+    return TablePlan(
+        order=[name for level in levels for name in level],
+        levels=levels,
+        parents={name: set(edges[name]) for name in names},
+        deferred=deferred,
+        broken=broken,
+    )
@@ -0,0 +1,233 @@
+import hashlib
+import logging
+import os
+import pickle
+import random
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ValuePool:
+    """
+    The `ValuePool` class holds values generated ahead by a slow generator and hands out random
+    ones from it, so the generator isn't called for every cell.
+
+    Parameters:
+        - `generator` (callable): The generator of the rule the pool stands for.
+        - `values` (list): The values the pool starts with.
+        - `size` (int): The number of values the pool is filled up to.
+        - `remix` (float): The share of samples that call the generator instead, the new value
+          replaces a random one of the pool so that it keeps changing over a long run.
+    """
+
+    def __init__(self, generator, values, size: int, remix: float = 0.0) -> None:
+        self.generator = generator
+        # Only ever appended to or replaced in place, so it can be sampled while it's filled
+        self.values = list(values)
+        self.size = size
+        self.remix = remix
+        self.changed = False
+
+    def sample(self):
+        """
+        The function `sample` returns a value of the pool, or a new value a `remix`
+        share of the time.
+        """
+        if self.remix and random.random() < self.remix:
+            value = self.generator()
+            self.values[random.randrange(len(self.values))] = value
+            self.changed = True
+            return value
+        return random.choice(self.values)
+
+    def fill(self, budget) -> None:
+        """
+        The function `fill` generates values until the pool is full or `budget`
+        refuses the memory they need.
+        """
+        while len(self.values) < self.size:
+            value = self.generator()
+            if not budget.take(estimate_size(value)):
+                break
+            self.values.append(value)
+            self.changed = True
+
+
+class PoolBudget:
+    """
+    The `PoolBudget` class keeps the total size of the pools under `max_bytes`,
+    None for no limit.
+    """
+
+    def __init__(self, max_bytes: int = None) -> None:
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.lock = threading.Lock()
+
+    def take(self, size, force=False) -> bool:
+        with self.lock:
+            if (
+                not force
+                and self.max_bytes is not None
+                and self.used + size > self.max_bytes
+            ):
+                return False
+            self.used += size
+            return True
+
+
+class PoolManager:
+    """
+    The `PoolManager` class decides which rules are sampled from a `ValuePool` and owns the
+    pools. A rule is pooled when it sets `pool` to True, or when it doesn't set `pool` and
+    a call to its generator takes longer than `threshold` seconds. Rules with a vectorized
+    `batch` generator are never pooled.
+
+    Parameters:
+        - `size` (int): The number of values generated per pool.
+        - `max_bytes` (int): The approximate memory budget of all the pools, None for no limit.
+        - `remix` (float): The share of samples that call the generator instead, see `ValuePool`.
+        - `threshold` (float): The cost in seconds per call above which a rule is pooled.
+        - `background` (bool): Fills the pools in background threads, sampling from the values
+          generated so far meanwhile, instead of filling them before they're used.
+        - `directory` (str): The directory where the pools are saved at the end of a run and read
+          back by the next one, None to keep them in memory only.
+    """
+
+    # Calls made to measure the cost of a generator, their values start the pool
+    probe_calls = 20
+
+    def __init__(
+        self,
+        size: int = 10_000,
+        max_bytes: int = None,
+        remix: float = 0.0,
+        threshold: float = 1e-4,
+        background: bool = False,
+        directory: str = None,
+    ) -> None:
+        self.size = max(1, size)
+        self.budget = PoolBudget(max_bytes)
+        self.remix = remix
+        self.threshold = threshold
+        self.background = background
+        self.directory = directory
+
+        # rule index -> its pool, or None when the rule isn't pooled
+        self.pools = {}
+        # rule index -> the rule, to find where its pool is saved
+        self.rules = {}
+        self.lock = threading.Lock()
+
+    def get(self, rule):
+        """
+        The function `get` returns the pool of a rule, creating it on first use,
+        or None if the rule isn't pooled.
+        """
+        with self.lock:
+            if rule.index not in self.pools:
+                self.pools[rule.index] = self.make_pool(rule)
+                self.rules[rule.index] = rule
+            return self.pools[rule.index]
+
+    def make_pool(self, rule):
+        setting = rule.field.get("pool")
+        if setting is False or rule.batch or not callable(rule.generator):
+            return None
+
+        if values := self.read(rule):
+            pool = ValuePool(rule.generator, values, self.size, self.remix)
+            logger.info("%s sampled from %d saved values", rule.describe(), len(values))
+        else:
+            started_at = time.perf_counter()
+            values = [rule.generator() for _ in range(self.probe_calls)]
+            cost = (time.perf_counter() - started_at) / self.probe_calls
+            if setting is not True and cost < self.threshold:
+                return None
+            # Kept even over the budget, a pool needs a few values to sample from
+            self.budget.take(sum(map(estimate_size, values)), force=True)
+
+            logger.info(
+                "%s sampled from a pool of %d values (%.0f us per call)",
+                rule.describe(),
+                self.size,
+                cost * 1e6,
+            )
+            pool = ValuePool(rule.generator, values, self.size, self.remix)
+            pool.changed = True
+
+        if self.background:
+            threading.Thread(target=pool.fill, args=(self.budget,), daemon=True).start()
+        else:
+            pool.fill(self.budget)
+        return pool
+
+    def path(self, rule):
+        # A pool is only read back by the same rule with the same generator code
+        code = getattr(rule.generator, "__code__", None)
+        digest = hashlib.sha256(
+            repr(
+                (
+                    rule.index,
+                    rule.field.get("name"),
+                    rule.field.get("type"),
+                    rule.table,
+                    code and code.co_code,
+                    code and code.co_consts,
+                    code and code.co_names,
+                    # Generators read from a spec file have no code but a stable repr
+                    None if code else repr(rule.generator),
+                )
+            ).encode()
+        ).hexdigest()[:32]
+        return os.path.join(self.directory, f"pool-{digest}.pickle")
+
+    def read(self, rule) -> list:
+        if not self.directory or not os.path.exists(path := self.path(rule)):
+            return []
+        try:
+            with open(path, "rb") as f:
+                values = pickle.load(f)
+        except Exception:
+            logger.warning("Ignoring unreadable value pool %s", path)
+            return []
+
+        kept = []
+        for value in values[: self.size]:
+            if not self.budget.take(estimate_size(value)):
+                break
+            kept.append(value)
+        return kept
+
+    def save(self) -> None:
+        """
+        The function `save` writes the pools that changed during the run to `directory`.
+        """
+        if not self.directory:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        with self.lock:
+            rules = list(self.rules.values())
+        for rule in rules:
+            pool = self.pools[rule.index]
+            if pool is None or not pool.changed:
+                continue
+            path = self.path(rule)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "wb") as f:
+                pickle.dump(list(pool.values), f)
+            os.replace(temp_path, path)
+
+
+def estimate_size(value) -> int:
+    """
+    The function `estimate_size` returns a rough size in bytes of a pooled value,
+    it's used to keep the pools under their memory budget.
+    """
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    return sys.getsizeof(value) + len(repr(value))
@@ -0,0 +1,170 @@
+import random
+
+from .enums import Nothing
+
+Nada = Nothing.Nada.value
+
+
+class ParentSampler:
+    """
+    The `ParentSampler` class picks the parent keys of a foreign key column. The keys are copied
+    into a list once, when the child table starts, and every draw is a single random index into
+    it, whatever the size of the parent table. Draws are uniform and with replacement.
+
+    A draw uses `number`, a random number in [0, 1) picked by the caller, when one is given,
+    so a seeded run picks the same parent for a row however its rows are split between runs.
+
+    Parameters:
+        - `values` (iterable): The keys of the referenced column.
+        - `rng` (Random): The random generator of the draws, a new one by default.
+    """
+
+    def __init__(self, values, rng: random.Random = None) -> None:
+        self.values = [value for value in values if value is not None]
+        self.rng = rng or random.Random()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def draw(self, number=None, row=None):
+        """
+        The function `draw` returns a parent key, or `Nada` when there's none to pick.
+        `row` is the position of the row in its table, only fixed draws use it.
+        """
+        if not self.values:
+            return Nada
+        if number is None:
+            number = self.rng.random()
+        return self.values[int(number * len(self.values))]
+
+
+class UniqueParentSampler(ParentSampler):
+    """
+    The `UniqueParentSampler` class picks every parent key at most once, for unique foreign
+    keys. A drawn key is swapped with the last one of the list and popped, so a draw stays
+    a constant time operation.
+
+    Parameters:
+        - `values` (iterable): The keys of the referenced column.
+        - `taken` (set): The keys already used by the child table, they're never drawn.
+        - `rng` (Random): The random generator of the draws, a new one by default.
+    """
+
+    def __init__(self, values, taken=frozenset(), rng: random.Random = None) -> None:
+        super().__init__((value for value in values if value not in taken), rng)
+
+    def draw(self, number=None, row=None):
+        if not self.values:
+            return Nada
+        if number is None:
+            number = self.rng.random()
+        index = int(number * len(self.values))
+        value = self.values[index]
+        self.values[index] = self.values[-1]
+        self.values.pop()
+        return value
+
+
+class ZipfParentSampler(ParentSampler):
+    """
+    The `ZipfParentSampler` class picks the parent keys with a Zipf distribution, the parent of
+    rank k gets a share of the children proportional to 1 / k ** `exponent`. Parents are ranked
+    in a random order, then drawn in constant time with Vose's alias method.
+
+    Parameters:
+        - `values` (iterable): The keys of the referenced column.
+        - `exponent` (float): The skew of the distribution, 0 is uniform and higher values give
+          the first parents a larger share.
+        - `rng` (Random): The random generator of the draws, a new one by default.
+    """
+
+    def __init__(self, values, exponent: float = 1.1, rng: random.Random = None) -> None:
+        super().__init__(values, rng)
+        self.rng.shuffle(self.values)
+
+        count = len(self.values)
+        weights = [1 / rank**exponent for rank in range(1, count + 1)]
+        total = sum(weights)
+
+        # Every slot holds the probability of its own parent and an alias
+        # drawn for the rest of the slot
+        self.probabilities = [0.0] * count
+        self.aliases = list(range(count))
+        scaled = [weight * count / total for weight in weights]
+        small = [index for index, weight in enumerate(scaled) if weight < 1]
+        large = [index for index, weight in enumerate(scaled) if weight >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probabilities[less] = scaled[less]
+            self.aliases[less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+        for index in small + large:
+            self.probabilities[index] = 1.0
+
+    def draw(self, number=None, row=None):
+        if not self.values:
+            return Nada
+        if number is None:
+            number = self.rng.random()
+        position = number * len(self.values)
+        index = int(position)
+        if position - index >= self.probabilities[index]:
+            index = self.aliases[index]
+        return self.values[index]
+
+
+class FixedParentSampler(ParentSampler):
+    """
+    The `FixedParentSampler` class gives every parent the same number of children. Parents are
+    taken in a random order, each for `children` draws in a row, and once every parent has its
+    children it starts over with the first one. When the caller gives the `row` of the draw,
+    the parent follows from the row's position instead of the number of draws made so far.
+
+    Parameters:
+        - `values` (iterable): The keys of the referenced column.
+        - `children` (int): The number of children of every parent.
+        - `rng` (Random): The random generator of the draws, a new one by default.
+    """
+
+    def __init__(self, values, children: int = 1, rng: random.Random = None) -> None:
+        super().__init__(values, rng)
+        self.rng.shuffle(self.values)
+        self.children = max(1, children)
+        self.drawn = 0
+
+    def draw(self, number=None, row=None):
+        if not self.values:
+            return Nada
+        if row is None:
+            row = self.drawn
+        index = (row // self.children) % len(self.values)
+        self.drawn += 1
+        return self.values[index]
+
+
+def make_sampler(values, distribution=None, unique=False, taken=frozenset(), rng=None):
+    """
+    The function `make_sampler` returns the sampler of a foreign key column. `distribution` is
+    None for uniform draws, or a dict such as `{"distribution": "zipf", "exponent": 1.2}` or
+    `{"distribution": "fixed", "children": 3}`. Unique foreign keys always pick each parent at
+    most once, skipping the keys in `taken`. `rng` is the random generator of the sampler.
+    """
+    if unique:
+        return UniqueParentSampler(values, taken=taken, rng=rng)
+
+    distribution = distribution or {}
+    kind = distribution.get("distribution", "uniform")
+    if kind == "uniform":
+        return ParentSampler(values, rng=rng)
+    if kind == "zipf":
+        return ZipfParentSampler(
+            values, exponent=distribution.get("exponent", 1.1), rng=rng
+        )
+    if kind == "fixed":
+        return FixedParentSampler(
+            values, children=distribution.get("children", 1), rng=rng
+        )
+    raise ValueError(
+        f"I don't know the distribution '{kind}', it can be 'uniform', 'zipf' or 'fixed'."
+    )
@@ -0,0 +1,164 @@
+import hashlib
+import logging
+import os
+import pickle
+
+import sqlalchemy
+from sqlalchemy_utils import has_unique_index
+
+logger = logging.getLogger(__name__)
+
+# One query per dialect, their results change whenever a table, column, key or index does
+FINGERPRINT_QUERIES = {
+    "mysql": [
+        "SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, "
+        "ORDINAL_POSITION FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() ORDER BY TABLE_NAME, ORDINAL_POSITION",
+        "SELECT TABLE_NAME, CONSTRAINT_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, "
+        "REFERENCED_COLUMN_NAME, ORDINAL_POSITION FROM information_schema.KEY_COLUMN_USAGE "
+        "WHERE TABLE_SCHEMA = DATABASE() "
+        "ORDER BY TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION",
+        "SELECT TABLE_NAME, INDEX_NAME, NON_UNIQUE, COLUMN_NAME, SEQ_IN_INDEX "
+        "FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() "
+        "ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX",
+    ],
+    "postgresql": [
+        "SELECT table_name, column_name, data_type, character_maximum_length, is_nullable, "
+        "ordinal_position FROM information_schema.columns "
+        "WHERE table_schema = current_schema() ORDER BY table_name, ordinal_position",
+        "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) "
+        "FROM pg_constraint WHERE connamespace = current_schema()::regnamespace "
+        "ORDER BY 1, 2",
+        "SELECT tablename, indexname, indexdef FROM pg_indexes "
+        "WHERE schemaname = current_schema() ORDER BY tablename, indexname",
+    ],
+    "sqlite": [
+        "SELECT type, name, tbl_name, sql FROM sqlite_master ORDER BY type, name",
+    ],
+}
+
+
+class SchemaModel:
+    """
+    The `SchemaModel` class holds everything the populator needs to know about the database
+    structure, read in a single reflection pass: the tables and their columns, the foreign keys,
+    the unique columns and the column lengths.
+
+    Parameters:
+        - `metadata` (MetaData): The metadata reflected from the database.
+    """
+
+    def __init__(self, metadata) -> None:
+        self.metadata = metadata
+        self.tables = dict(metadata.tables)
+
+        # table name -> {column name: (referred column name, referred table name)}
+        self.foreign_columns = {}
+        # table name -> names of the tables it refers to
+        self.referred_tables = {}
+        # table name -> names of the columns having a unique index
+        self.unique_columns = {}
+        # table name -> {column name: length}, for the columns having a length
+        self.lengths = {}
+
+        for name, table in self.tables.items():
+            self.foreign_columns[name] = {}
+            self.referred_tables[name] = set()
+            for constraint in table.foreign_key_constraints:
+                element = constraint.elements[0]
+                self.foreign_columns[name][element.parent.name] = (
+                    element.column.name,
+                    element.column.table.name,
+                )
+                self.referred_tables[name].add(element.column.table.name)
+            self.referred_tables[name] = list(self.referred_tables[name])
+
+            self.unique_columns[name] = [
+                column.name for column in table.columns if has_unique_index(column)
+            ]
+            self.lengths[name] = {
+                column.name: column.type.length
+                for column in table.columns
+                if getattr(column.type, "length", None) is not None
+            }
+
+    def table_names(self) -> list:
+        return list(self.tables)
+
+    def key_columns(self) -> set:
+        """
+        The function `key_columns` returns the (table name, column name) pairs that are
+        unique or referred to by a foreign key.
+        """
+        columns = {
+            (table_name, column_name)
+            for table_name, column_names in self.unique_columns.items()
+            for column_name in column_names
+        }
+        columns.update(
+            (referred_table, referred_column)
+            for foreign_columns in self.foreign_columns.values()
+            for referred_column, referred_table in foreign_columns.values()
+        )
+        return columns
+
+    @classmethod
+    def reflect(cls, engine) -> "SchemaModel":
+        """
+        The function `reflect` reads the whole schema with a single reflection pass.
+        """
+        metadata = sqlalchemy.MetaData()
+        metadata.reflect(bind=engine)
+        return cls(metadata)
+
+    @classmethod
+    def load(cls, engine, cache_dir: str = None) -> "SchemaModel":
+        """
+        The function `load` returns the schema model of the database. When a `cache_dir`
+        is given, the model is stored there under the schema fingerprint, and later runs
+        against an unchanged schema read it back instead of introspecting the database.
+        """
+        fingerprint = schema_fingerprint(engine) if cache_dir else None
+        if fingerprint is None:
+            return cls.reflect(engine)
+
+        path = os.path.join(cache_dir, f"schema-{fingerprint}.pickle")
+        if os.path.exists(path):
+            try:
+                return cls.read(path)
+            except Exception:
+                logger.warning("Ignoring unreadable schema cache %s", path)
+
+        model = cls.reflect(engine)
+        model.write(path)
+        return model
+
+    @classmethod
+    def read(cls, path) -> "SchemaModel":
+        with open(path, "rb") as f:
+            return cls(pickle.load(f))
+
+    def write(self, path) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Written aside and moved in place so an interrupted run can't leave half a cache
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(self.metadata, f)
+        os.replace(temp_path, path)
+
+
+def schema_fingerprint(engine):
+    """
+    The function `schema_fingerprint` hashes the catalog description of the schema, or
+    returns None for dialects it doesn't know how to fingerprint.
+    """
+    queries = FINGERPRINT_QUERIES.get(engine.dialect.name)
+    if not queries:
+        return None
+
+    digest = hashlib.sha256(sqlalchemy.__version__.encode())
+    with engine.connect() as connection:
+        for query in queries:
+            for row in connection.exec_driver_sql(query):
+                digest.update(repr(tuple(row)).encode())
+    return digest.hexdigest()[:32]
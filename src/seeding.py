@@ -0,0 +1,37 @@
+import hashlib
+import random
+
+import numpy
+
+# The rows of a table are generated by blocks of this many rows, each block of each column from
+# its own seed, so a row gets the same values whatever range of rows a run generates
+BLOCK_ROWS = 1024
+
+
+def derive_seed(seed, *parts) -> int:
+    """
+    The function `derive_seed` returns a 64 bit seed derived from the seed of the run and
+    `parts`, such as a table name, a column name and a block number. The seeds of different
+    parts are unrelated, and the same parts always give the same seed on any machine.
+    """
+    digest = hashlib.blake2b(repr((seed, *parts)).encode(), digest_size=8)
+    return int.from_bytes(digest.digest(), "big")
+
+
+def seed_generators(seed, fake=None):
+    """
+    The function `seed_generators` seeds the `random` module and the `Faker` instance `fake`
+    used by the rules, and returns a NumPy generator for the vectorized rules seeded the same.
+    """
+    random.seed(seed)
+    if fake is not None:
+        fake.seed_instance(seed)
+    return numpy.random.default_rng(seed)
+
+
+def row_numbers(seed, count) -> list:
+    """
+    The function `row_numbers` returns `count` pairs of random numbers in [0, 1), one pair per
+    row: the first decides whether the cell is NULL and the second picks its parent key.
+    """
+    return numpy.random.default_rng(seed).random((count, 2)).tolist()
@@ -0,0 +1,776 @@
+import csv
+import datetime
+import decimal
+import gzip
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from sqlalchemy import types
+from sqlalchemy.types import NullType, _Binary
+
+from .batch import ColumnBatch, iter_columns, iter_rows
+
+logger = logging.getLogger(__name__)
+
+# MySQL types SQLAlchemy doesn't know are reflected as `NullType`, in practice the spatial ones
+GEOMETRY_TYPES = ("GEOMETRY", "POINT", "LINESTRING", "POLYGON")
+
+# The connect argument every MySQL driver needs to send local files with `LOAD DATA`,
+# the drivers not listed here get batched inserts instead
+LOCAL_INFILE_ARGS = {
+    "mysqlconnector": {"allow_local_infile": True},
+    "pymysql": {"local_infile": 1},
+    "mysqldb": {"local_infile": 1},
+}
+
+# Set on the connection filling a SQLite table. The data is only at risk if the machine
+# stops during the run, and the file can then be filled again from scratch
+SQLITE_PRAGMAS = (
+    "PRAGMA synchronous = OFF",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",
+)
+
+
+class InsertSink:
+    """
+    The `InsertSink` class writes each batch with a single executemany insert and
+    commits once per batch. The database sinks call `on_commit` with the table and the
+    number of rows of every commit, when it's set.
+
+    A `ColumnBatch` is bound as tuples straight to the driver when its paramstyle is
+    positional, with the bind processors of the column types applied column by column.
+
+    Parameters:
+        - `engine` (Engine): The engine of the database to fill.
+    """
+
+    def __init__(self, engine) -> None:
+        self.engine = engine
+        # The insert statement of every table is built once and reused for every batch,
+        # SQLAlchemy compiles it on first use and serves it from its cache afterwards
+        self.statements = {}
+        # table name -> (SQL, positions of the columns, bind processors) for `ColumnBatch`
+        self.positional_statements = {}
+        self.on_commit = None
+
+    def write(self, table, rows) -> None:
+        """
+        The function `write` inserts a batch of rows and commits it.
+        """
+        with self.engine.begin() as connection:
+            self.execute(connection, table, rows)
+        self.committed(table, len(rows))
+
+    def execute(self, connection, table, rows) -> None:
+        if isinstance(rows, ColumnBatch):
+            if (statement := self.positional_statement(table, rows.names)) is None:
+                rows = rows.dicts()
+            else:
+                sql, positions, processors = statement
+                columns = [
+                    column if processor is None else [processor(value) for value in column]
+                    for column, processor in zip(
+                        (rows.columns[position] for position in positions), processors
+                    )
+                ]
+                connection.exec_driver_sql(sql, list(zip(*columns)))
+                return
+
+        if table.name not in self.statements:
+            self.statements[table.name] = table.insert()
+        connection.execute(self.statements[table.name], rows)
+
+    def positional_statement(self, table, names):
+        """
+        The function `positional_statement` compiles the insert of the columns `names` for
+        the driver, or returns None when the driver takes named parameters only.
+        """
+        key = (table.name, tuple(names))
+        if key not in self.positional_statements:
+            dialect = self.engine.dialect
+            compiled = table.insert().compile(dialect=dialect, column_keys=names)
+            statement = None
+            if compiled.positional:
+                try:
+                    keys = [compiled.binds[name].key for name in compiled.positiontup]
+                    positions = [names.index(key) for key in keys]
+                except (KeyError, ValueError):
+                    positions = None
+                if positions is not None:
+                    processors = [
+                        table.columns[key].type.dialect_impl(dialect).bind_processor(dialect)
+                        for key in keys
+                    ]
+                    statement = (str(compiled), positions, processors)
+            self.positional_statements[key] = statement
+        return self.positional_statements[key]
+
+    def committed(self, table, rows) -> None:
+        if self.on_commit is not None:
+            self.on_commit(table, rows)
+
+    def finish_table(self, table) -> None:
+        """
+        The function `finish_table` is called once every row of a table was written,
+        everything written must be committed when it returns.
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class LoadDataSink(InsertSink):
+    """
+    The `LoadDataSink` class streams the rows of a table into a temporary tab separated file
+    and loads it with MySQL's `LOAD DATA LOCAL INFILE`, committing once per chunk. When the
+    server or the connector doesn't allow local files, it falls back to batched inserts.
+
+    Parameters:
+        - `engine` (Engine): The engine of the database to fill, it must allow local infile.
+        - `chunk_rows` (int): The number of rows loaded from a single file.
+    """
+
+    def __init__(self, engine, chunk_rows: int = 100_000) -> None:
+        super().__init__(engine)
+        self.chunk_rows = max(1, chunk_rows)
+        # table name -> the chunk being written, see `open_chunk`
+        self.chunks = {}
+        self.enabled = self.is_available()
+
+    def is_available(self) -> bool:
+        if self.engine.dialect.name != "mysql":
+            logger.warning(
+                "LOAD DATA is only available on MySQL, using batched inserts instead"
+            )
+            return False
+        if self.engine.dialect.driver not in LOCAL_INFILE_ARGS:
+            logger.warning(
+                "I don't know how to allow local files with the %s driver, "
+                "using batched inserts instead",
+                self.engine.dialect.driver,
+            )
+            return False
+
+        with self.engine.connect() as connection:
+            row = connection.exec_driver_sql(
+                "SHOW VARIABLES LIKE 'local_infile'"
+            ).first()
+        if not row or str(row[1]).upper() not in ("ON", "1"):
+            logger.warning(
+                "The server has local_infile disabled, using batched inserts instead"
+            )
+            return False
+        return True
+
+    def write(self, table, rows) -> None:
+        if not self.enabled:
+            return super().write(table, rows)
+
+        chunk = self.chunks.get(table.name) or self.open_chunk(table)
+        file = chunk["file"]
+        kinds = [kind for _, kind in chunk["columns"]]
+        for values in iter_rows(rows, [name for name, _ in chunk["columns"]]):
+            file.write(
+                "\t".join(self.encode(value, kind) for value, kind in zip(values, kinds))
+            )
+            file.write("\n")
+        chunk["rows"] += len(rows)
+
+        if chunk["rows"] >= self.chunk_rows:
+            self.load_chunk(table)
+
+    def encode(self, value, kind) -> str:
+        return encode(value, kind)
+
+    def finish_table(self, table) -> None:
+        if table.name in self.chunks:
+            self.load_chunk(table)
+
+    def close(self) -> None:
+        # Chunks left behind by a failed table
+        for chunk in self.chunks.values():
+            chunk["file"].close()
+            os.remove(chunk["file"].name)
+        self.chunks.clear()
+
+    def open_chunk(self, table):
+        """
+        The function `open_chunk` starts a new temporary file for a table. Binary
+        columns are written as hex and spatial columns as WKT, the `LOAD DATA`
+        statement converts them back.
+        """
+        self.chunks[table.name] = {
+            "file": tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                newline="",
+                suffix=".tsv",
+                prefix=f"dataforge-{table.name}-",
+                delete=False,
+            ),
+            "columns": column_kinds(table),
+            "rows": 0,
+        }
+        return self.chunks[table.name]
+
+    def load_chunk(self, table) -> None:
+        chunk = self.chunks.pop(table.name)
+        chunk["file"].close()
+        try:
+            with self.engine.begin() as connection:
+                connection.exec_driver_sql(
+                    load_data_statement(table.name, chunk["file"].name, chunk["columns"])
+                )
+        finally:
+            os.remove(chunk["file"].name)
+        self.committed(table, chunk["rows"])
+
+
+class CopySink(LoadDataSink):
+    """
+    The `CopySink` class streams the rows of a table into a temporary file in the text format
+    of PostgreSQL's `COPY` and sends it with `COPY ... FROM STDIN`, committing once per chunk.
+    It needs the psycopg2 or psycopg driver and falls back to batched inserts otherwise.
+
+    Parameters:
+        - `engine` (Engine): The engine of the PostgreSQL database to fill.
+        - `chunk_rows` (int): The number of rows sent with a single `COPY`.
+    """
+
+    def is_available(self) -> bool:
+        if self.engine.dialect.name != "postgresql":
+            logger.warning(
+                "COPY is only available on PostgreSQL, using batched inserts instead"
+            )
+            return False
+        if self.engine.dialect.driver not in ("psycopg2", "psycopg"):
+            logger.warning(
+                "COPY needs the psycopg2 or psycopg driver, not %s, "
+                "using batched inserts instead",
+                self.engine.dialect.driver,
+            )
+            return False
+        return True
+
+    def encode(self, value, kind) -> str:
+        field = encode(value, kind)
+        if kind == "binary" and value is not None:
+            # bytea reads hex after a `\x` prefix, its backslash is doubled for COPY
+            field = "\\\\x" + field
+        return field
+
+    def open_chunk(self, table):
+        # Nothing reads the file by its name, so it can go away as soon as it's closed
+        self.chunks[table.name] = {
+            "file": tempfile.TemporaryFile("w+", encoding="utf-8", newline=""),
+            "columns": column_kinds(table),
+            "rows": 0,
+        }
+        return self.chunks[table.name]
+
+    def load_chunk(self, table) -> None:
+        chunk = self.chunks.pop(table.name)
+        file = chunk["file"]
+        try:
+            file.seek(0)
+            statement = copy_statement(
+                table.name, [name for name, _ in chunk["columns"]], self.engine.dialect
+            )
+            with self.engine.begin() as connection:
+                cursor = connection.connection.driver_connection.cursor()
+                try:
+                    if self.engine.dialect.driver == "psycopg2":
+                        cursor.copy_expert(statement, file)
+                    else:
+                        with cursor.copy(statement) as copy:
+                            while data := file.read(1024 * 1024):
+                                copy.write(data)
+                finally:
+                    cursor.close()
+        finally:
+            file.close()
+        self.committed(table, chunk["rows"])
+
+    def close(self) -> None:
+        for chunk in self.chunks.values():
+            chunk["file"].close()
+        self.chunks.clear()
+
+
+class SQLiteSink(InsertSink):
+    """
+    The `SQLiteSink` class fills every table in a single transaction, on a connection tuned with
+    `SQLITE_PRAGMAS`. SQLite has a single writer, so tables are written one at a time even when
+    several are filled at the same time, the others wait for the transaction to be committed.
+
+    Parameters:
+        - `engine` (Engine): The engine of the SQLite database to fill.
+    """
+
+    def __init__(self, engine) -> None:
+        super().__init__(engine)
+        # table name -> the connection holding the open transaction of the table
+        self.connections = {}
+        # table name -> the number of rows of the open transaction
+        self.rows = {}
+        self.write_lock = threading.Lock()
+
+    def write(self, table, rows) -> None:
+        connection = self.connections.get(table.name) or self.begin_table(table)
+        self.execute(connection, table, rows)
+        self.rows[table.name] = self.rows.get(table.name, 0) + len(rows)
+
+    def begin_table(self, table):
+        self.write_lock.acquire()
+        try:
+            connection = self.engine.connect()
+            for pragma in SQLITE_PRAGMAS:
+                connection.exec_driver_sql(pragma)
+        except BaseException:
+            self.write_lock.release()
+            raise
+        self.connections[table.name] = connection
+        return connection
+
+    def finish_table(self, table) -> None:
+        if (connection := self.connections.pop(table.name, None)) is None:
+            return
+        try:
+            connection.commit()
+        finally:
+            connection.close()
+            self.write_lock.release()
+        self.committed(table, self.rows.pop(table.name, 0))
+
+    def close(self) -> None:
+        # Transactions left open by a failed table are rolled back
+        for connection in self.connections.values():
+            connection.close()
+            self.write_lock.release()
+        self.connections.clear()
+        self.rows.clear()
+
+
+class FileSink:
+    """
+    The `FileSink` class is the base of the sinks writing the generated rows to files instead
+    of a database. Every batch is written as soon as it's generated, so memory stays bounded
+    whatever the size of a table.
+
+    Parameters:
+        - `directory` (str): The directory the files are written to, it's created if needed.
+        - `compression` (str): `gzip` to compress the files, or None.
+    """
+
+    extension = ""
+
+    def __init__(self, directory: str, compression: str = None) -> None:
+        if compression not in (None, "gzip"):
+            raise ValueError(
+                f"I can only compress {self.extension} files with 'gzip', not '{compression}'."
+            )
+        self.directory = directory
+        self.compression = compression
+        os.makedirs(directory, exist_ok=True)
+
+    def open_file(self, name):
+        path = os.path.join(self.directory, f"{name}{self.extension}")
+        if self.compression == "gzip":
+            return gzip.open(f"{path}.gz", "wt", encoding="utf-8", newline="")
+        return open(path, "w", encoding="utf-8", newline="")
+
+    def finish_table(self, table) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SQLDumpSink(FileSink):
+    """
+    The `SQLDumpSink` class writes every batch as a multi-row `INSERT` statement to a single
+    SQL file. Tables are filled in topological order, so parents come before their children.
+
+    Parameters:
+        - `directory` (str): The directory of the `dump.sql` file.
+        - `dialect` (Dialect): The dialect used to quote identifiers and values.
+        - `compression` (str): `gzip` to compress the file, or None.
+    """
+
+    extension = ".sql"
+
+    def __init__(self, directory: str, dialect, compression: str = None) -> None:
+        super().__init__(directory, compression)
+        self.dialect = dialect
+        self.file = self.open_file("dump")
+        # Tables filled in parallel share the file
+        self.lock = threading.Lock()
+
+    def write(self, table, rows) -> None:
+        quote = self.dialect.identifier_preparer.quote
+        columns = [column.name for column in table.columns]
+        values = ",\n".join(
+            "(" + ", ".join(sql_literal(value, self.dialect) for value in row) + ")"
+            for row in iter_rows(rows, columns)
+        )
+        statement = (
+            f"INSERT INTO {quote(table.name)} "
+            f"({', '.join(map(quote, columns))}) VALUES\n{values};\n"
+        )
+        with self.lock:
+            self.file.write(statement)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class CSVSink(FileSink):
+    """
+    The `CSVSink` class writes every table to its own CSV file with a header row.
+    NULL is written as an empty field, binary values as hex.
+
+    Parameters:
+        - `directory` (str): The directory of the `<table>.csv` files.
+        - `compression` (str): `gzip` to compress the files, or None.
+    """
+
+    extension = ".csv"
+
+    def __init__(self, directory: str, compression: str = None) -> None:
+        super().__init__(directory, compression)
+        # table name -> (file, csv writer)
+        self.files = {}
+
+    def write(self, table, rows) -> None:
+        columns = [column.name for column in table.columns]
+        if table.name not in self.files:
+            file = self.open_file(table.name)
+            self.files[table.name] = (file, csv.writer(file))
+            self.files[table.name][1].writerow(columns)
+
+        writer = self.files[table.name][1]
+        writer.writerows(
+            ["" if value is None else text(value) for value in row]
+            for row in iter_rows(rows, columns)
+        )
+
+    def finish_table(self, table) -> None:
+        if table.name in self.files:
+            self.files.pop(table.name)[0].close()
+
+    def close(self) -> None:
+        for file, _ in self.files.values():
+            file.close()
+        self.files.clear()
+
+
+class ParquetSink(FileSink):
+    """
+    The `ParquetSink` class writes every table to its own Parquet file through Arrow. Rows are
+    buffered until `row_group_rows` is reached and written as one row group. Columns are typed
+    from the schema, DECIMAL columns as Arrow decimals of their precision and scale, and a column
+    whose values don't fit its type is written as strings.
+
+    Parameters:
+        - `directory` (str): The directory of the `<table>.parquet` files.
+        - `compression` (str): The Parquet codec, such as `snappy`, `zstd` or `gzip`, or None.
+        - `row_group_rows` (int): The number of rows in a row group.
+    """
+
+    extension = ".parquet"
+
+    def __init__(
+        self, directory: str, compression: str = None, row_group_rows: int = 65536
+    ) -> None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as error:
+            raise ValueError(
+                "I need `pyarrow` to write Parquet files, "
+                "you can install it with `pip install pyarrow`."
+            ) from error
+
+        self.pyarrow = pyarrow
+        self.parquet = pyarrow.parquet
+        self.directory = directory
+        self.compression = compression or "none"
+        self.row_group_rows = max(1, row_group_rows)
+        os.makedirs(directory, exist_ok=True)
+
+        # table name -> {"writer", "schema", "columns", "rows"}, the rows of the next row
+        # group are buffered as one list of values per column
+        self.tables = {}
+
+    def write(self, table, rows) -> None:
+        state = self.tables.setdefault(
+            table.name,
+            {
+                "writer": None,
+                "schema": None,
+                "columns": {column.name: [] for column in table.columns},
+                "rows": 0,
+            },
+        )
+        for name, values in iter_columns(rows, list(state["columns"])):
+            state["columns"][name].extend(values)
+        state["rows"] += len(rows)
+        if state["rows"] >= self.row_group_rows:
+            self.write_row_group(table, state)
+
+    def write_row_group(self, table, state) -> None:
+        if not state["rows"]:
+            return
+        columns = state["columns"]
+        state["columns"] = {name: [] for name in columns}
+        state["rows"] = 0
+
+        if state["writer"] is None:
+            # The first row group decides the type of every column
+            state["schema"] = self.pyarrow.schema(
+                [
+                    (name, self.column_type(column, columns[name]))
+                    for name, column in zip(columns, table.columns)
+                ]
+            )
+            state["writer"] = self.parquet.ParquetWriter(
+                os.path.join(self.directory, f"{table.name}{self.extension}"),
+                state["schema"],
+                compression=self.compression,
+            )
+
+        schema = state["schema"]
+        arrays = [
+            self.make_array(columns[field.name], field.type) for field in schema
+        ]
+        state["writer"].write_table(
+            self.pyarrow.Table.from_arrays(arrays, schema=schema)
+        )
+
+    def column_type(self, column, values):
+        pyarrow = self.pyarrow
+        if isinstance(column.type, types.Boolean):
+            arrow_type = pyarrow.bool_()
+        elif isinstance(column.type, types.Integer):
+            arrow_type = pyarrow.int64()
+        elif isinstance(column.type, types.Float):
+            arrow_type = pyarrow.float64()
+        elif isinstance(column.type, types.Numeric):
+            # Unbounded NUMERIC values can't be typed exactly, they're kept as strings
+            if column.type.precision is None:
+                return pyarrow.string()
+            precision, scale = column.type.precision, column.type.scale or 0
+            arrow_type = (pyarrow.decimal128 if precision <= 38 else pyarrow.decimal256)(
+                precision, scale
+            )
+        elif isinstance(column.type, types.DateTime):
+            arrow_type = pyarrow.timestamp("us")
+        elif isinstance(column.type, types.Date):
+            arrow_type = pyarrow.date32()
+        elif isinstance(column.type, _Binary):
+            arrow_type = pyarrow.binary()
+        else:
+            return pyarrow.string()
+
+        try:
+            self.make_array(values, arrow_type)
+            return arrow_type
+        except (
+            pyarrow.ArrowException,
+            TypeError,
+            ValueError,
+            OverflowError,
+            decimal.InvalidOperation,
+        ):
+            return pyarrow.string()
+
+    def make_array(self, values, arrow_type):
+        pyarrow = self.pyarrow
+        if arrow_type == pyarrow.string():
+            values = [None if value is None else text(value) for value in values]
+        elif arrow_type == pyarrow.float64():
+            values = [None if value is None else float(value) for value in values]
+        elif pyarrow.types.is_decimal(arrow_type):
+            # Floats are rounded to the scale of the column, as the database would store them
+            exponent = decimal.Decimal(1).scaleb(-arrow_type.scale)
+            with decimal.localcontext() as context:
+                context.prec = arrow_type.precision
+                context.rounding = decimal.ROUND_HALF_UP
+                values = [
+                    None
+                    if value is None
+                    else decimal.Decimal(str(value)).quantize(exponent)
+                    for value in values
+                ]
+        return pyarrow.array(values, type=arrow_type)
+
+    def finish_table(self, table) -> None:
+        if state := self.tables.pop(table.name, None):
+            self.write_row_group(table, state)
+            if state["writer"] is not None:
+                state["writer"].close()
+
+    def close(self) -> None:
+        for state in self.tables.values():
+            if state["writer"] is not None:
+                state["writer"].close()
+        self.tables.clear()
+
+
+def load_data_statement(table_name, path, columns) -> str:
+    """
+    The function `load_data_statement` builds the `LOAD DATA LOCAL INFILE` statement of a
+    chunk. Binary and spatial values are read into user variables and converted with `SET`.
+    """
+    targets = []
+    conversions = []
+    for index, (name, kind) in enumerate(columns):
+        if kind == "text":
+            targets.append(quote_identifier(name))
+            continue
+
+        variable = f"@v{index}"
+        targets.append(variable)
+        function = "UNHEX" if kind == "binary" else "ST_GeomFromText"
+        conversions.append(
+            f"{quote_identifier(name)} = IF({variable} IS NULL, NULL, {function}({variable}))"
+        )
+
+    path = path.replace("\\", "\\\\").replace("'", "\\'")
+    statement = (
+        f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE {quote_identifier(table_name)} "
+        f"CHARACTER SET utf8mb4 "
+        f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+        f"LINES TERMINATED BY '\\n' "
+        f"({', '.join(targets)})"
+    )
+    if conversions:
+        statement += f" SET {', '.join(conversions)}"
+    return statement
+
+
+def copy_statement(table_name, column_names, dialect) -> str:
+    quote = dialect.identifier_preparer.quote
+    return (
+        f"COPY {quote(table_name)} ({', '.join(quote(name) for name in column_names)}) "
+        f"FROM STDIN"
+    )
+
+
+def column_kinds(table) -> list:
+    """
+    The function `column_kinds` returns the (column name, kind) pairs of a table, the kind
+    tells `encode` how to write the values: `binary`, `geometry` or `text`.
+    """
+    columns = []
+    for column in table.columns:
+        # `_Binary` is the base of both the BINARY and the BLOB families
+        if isinstance(column.type, _Binary):
+            kind = "binary"
+        elif isinstance(column.type, NullType) or any(
+            name in str(column.type).upper() for name in GEOMETRY_TYPES
+        ):
+            kind = "geometry"
+        else:
+            kind = "text"
+        columns.append((column.name, kind))
+    return columns
+
+
+def quote_identifier(name) -> str:
+    return "`" + str(name).replace("`", "``") + "`"
+
+
+def encode(value, kind="text") -> str:
+    """
+    The function `encode` turns a value into a field of the tab separated file,
+    escaped the way `LOAD DATA` reads it back.
+    """
+    if value is None:
+        return "\\N"
+
+    if kind == "binary":
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        return bytes(value).hex()
+
+    if kind == "geometry" and isinstance(value, (tuple, list)):
+        # Points are generated as (longitude, latitude)
+        value = f"POINT({value[0]} {value[1]})"
+    elif isinstance(value, bool):
+        value = int(value)
+    elif isinstance(value, (set, frozenset)):
+        # MySQL SET values are written as comma separated members
+        value = ",".join(sorted(map(str, value)))
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    elif isinstance(value, datetime.datetime):
+        value = value.isoformat(sep=" ")
+    elif isinstance(value, (datetime.date, datetime.time)):
+        value = value.isoformat()
+    elif isinstance(value, bytes):
+        value = value.decode("utf-8", errors="replace")
+    elif isinstance(value, (decimal.Decimal, float, int)):
+        value = str(value)
+
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\0", "\\0")
+    )
+
+
+def text(value) -> str:
+    """
+    The function `text` turns a value into the text written to CSV and to
+    string columns of Parquet files.
+    """
+    if isinstance(value, bytes):
+        return value.hex()
+    if isinstance(value, tuple) and len(value) == 2:
+        # Points are generated as (longitude, latitude)
+        return f"POINT({value[0]} {value[1]})"
+    if isinstance(value, (set, frozenset)):
+        return ",".join(sorted(map(str, value)))
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return str(int(value))
+    return str(value)
+
+
+def sql_literal(value, dialect) -> str:
+    """
+    The function `sql_literal` renders a value as a SQL literal for the SQL dump.
+    """
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        if dialect.name == "postgresql":
+            return "TRUE" if value else "FALSE"
+        return "1" if value else "0"
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return str(value)
+    if isinstance(value, bytes):
+        if dialect.name == "postgresql":
+            return f"'\\x{value.hex()}'::bytea"
+        return f"X'{value.hex()}'"
+    if isinstance(value, tuple) and len(value) == 2:
+        return f"ST_GeomFromText('POINT({value[0]} {value[1]})')"
+
+    value = text(value).replace("'", "''")
+    if dialect.name == "mysql":
+        # MySQL also treats backslashes as escapes inside strings
+        value = value.replace("\\", "\\\\")
+    return f"'{value}'"
@@ -0,0 +1,178 @@
+import importlib
+import os
+import tomllib
+
+from . import vectorized
+
+# Keys a rule of a spec file can have
+RULE_KEYS = {"name", "type", "table", "provider", "args", "value", "batch", "pool"}
+
+
+class LazyFaker:
+    """
+    The `LazyFaker` class stands for a `faker.Faker`, which is only imported and built the
+    first time one of its providers is used, so runs that don't need it don't pay for it.
+
+    Parameters:
+        - `locale` (str): The locale of the `Faker`, `None` for Faker's default.
+    """
+
+    def __init__(self, locale: str = None) -> None:
+        self.locale = locale
+        self.faker = None
+
+    def __getattr__(self, name):
+        # Only called for the attributes the proxy doesn't have, i.e. the providers
+        if name.startswith("__") or name in ("locale", "faker"):
+            raise AttributeError(name)
+        if self.faker is None:
+            faker = importlib.import_module("faker")
+            self.faker = faker.Faker(self.locale)
+        return getattr(self.faker, name)
+
+    def __getstate__(self) -> dict:
+        # The `Faker` is built again in the process it's sent to
+        return {"locale": self.locale, "faker": None}
+
+
+class ProviderGenerator:
+    """
+    The `ProviderGenerator` class is the generator of a rule read from a spec file, it calls
+    the Faker provider `provider` with `args`. The provider is looked up on the first call.
+    It can be pickled, unlike the lambdas of `data.py`.
+
+    Parameters:
+        - `fake` (LazyFaker): The `fake` the provider belongs to.
+        - `provider` (str): The name of the provider, such as `email` or `pyint`.
+        - `args` (dict): The keyword arguments of the provider.
+    """
+
+    def __init__(self, fake, provider: str, args: dict = None) -> None:
+        self.fake = fake
+        self.provider = provider
+        self.args = args or {}
+        self.method = None
+
+    def __call__(self):
+        if self.method is None:
+            self.method = getattr(self.fake, self.provider, None)
+            if not callable(self.method):
+                self.method = None
+                raise ValueError(
+                    f"I can't find the Faker provider '{self.provider}', maybe check "
+                    f"its spelling in the spec file?"
+                )
+        return self.method(**self.args)
+
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, "method": None}
+
+    def __repr__(self) -> str:
+        return f"ProviderGenerator({self.provider!r}, {self.args!r})"
+
+
+def read_spec(path: str) -> dict:
+    """
+    The function `read_spec` reads a TOML spec file, or a YAML one when PyYAML is installed,
+    as plain data without running any code.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as error:
+            raise ValueError(
+                "I need `pyyaml` to read YAML spec files, "
+                "you can install it with `pip install pyyaml`."
+            ) from error
+        with open(path, encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+    if extension != ".toml":
+        raise ValueError(
+            f"I can't read the spec file '{path}', it should be a .toml or .yaml file."
+        )
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def make_batch(batch: dict, where: str):
+    """
+    The function `make_batch` builds the vectorized generator of a rule from
+    `{"generator": "Integers", "args": {"low": 0, "high": 100}}`.
+    """
+    generator = getattr(vectorized, str(batch.get("generator")), None)
+    if not (
+        isinstance(generator, type)
+        and issubclass(generator, vectorized.BatchGenerator)
+        and generator is not vectorized.BatchGenerator
+    ):
+        raise ValueError(
+            f"I don't know the vectorized generator {batch.get('generator')!r} of {where}, "
+            f"it should be one of the classes of `src.vectorized` such as 'Integers'."
+        )
+    return generator(**batch.get("args", {}))
+
+
+def make_rules(rules: list, fake, where: str) -> list[dict]:
+    """
+    The function `make_rules` turns the rules of a spec file into rules
+    like the ones of `data.py`.
+    """
+    fields = []
+    for index, rule in enumerate(rules or []):
+        rule_where = f"rule #{index} of {where}"
+        if unknown := set(rule) - RULE_KEYS:
+            raise ValueError(
+                f"I don't know the keys {', '.join(sorted(unknown))} of {rule_where}, "
+                f"a rule can have {', '.join(sorted(RULE_KEYS))}."
+            )
+        if ("provider" in rule) == ("value" in rule):
+            raise ValueError(
+                f"I need either a `provider` or a `value` in {rule_where}, but not both."
+            )
+        field = {
+            "name": rule.get("name"),
+            "type": rule.get("type"),
+            "table": rule.get("table"),
+            "generator": (
+                ProviderGenerator(fake, rule["provider"], rule.get("args"))
+                if "provider" in rule
+                else rule["value"]
+            ),
+        }
+        if "batch" in rule:
+            field["batch"] = make_batch(rule["batch"], rule_where)
+        if "pool" in rule:
+            field["pool"] = rule["pool"]
+        fields.append(field)
+    return fields
+
+
+def load_spec(path: str, fake) -> tuple[list[dict], list[dict]]:
+    """
+    The function `load_spec` reads the `fields` and `special_foreign_fields` of a spec file,
+    whose rules call the providers of `fake`. A rule looks like:
+
+        [[fields]]
+        name = "email"
+        type = "varchar"
+        provider = "email"
+
+        [[fields]]
+        type = "int"
+        provider = "pyint"
+        args = { min_value = 0, max_value = 100 }
+        batch = { generator = "Integers", args = { low = 0, high = 100 } }
+
+    `value` gives a constant instead of `provider`, and `table` and `pool` work as in `data.py`.
+    """
+    spec = read_spec(path)
+    where = f"'{os.path.basename(path)}'"
+    return (
+        make_rules(spec.get("fields"), fake, f"`fields` in {where}"),
+        make_rules(
+            spec.get("special_foreign_fields"),
+            fake,
+            f"`special_foreign_fields` in {where}",
+        ),
+    )
@@ -0,0 +1,148 @@
+import re
+
+from sqlalchemy import types
+
+from .unique import INTEGER_BITS
+
+# Bytes a row takes on disk on top of its values, roughly InnoDB's record header
+# and transaction fields, PostgreSQL's tuple header is about the same size
+ROW_OVERHEAD = 24
+
+SIZE_UNITS = {
+    "": 1,
+    "B": 1,
+    "KB": 1000,
+    "MB": 1000**2,
+    "GB": 1000**3,
+    "TB": 1000**4,
+    "KIB": 1024,
+    "MIB": 1024**2,
+    "GIB": 1024**3,
+    "TIB": 1024**4,
+}
+
+
+def parse_size(value) -> int:
+    """
+    The function `parse_size` returns a size in bytes given as a number of bytes
+    or as a string such as "500MB" or "2 GiB".
+    """
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]*)\s*", str(value))
+    if not match or match.group(2).upper() not in SIZE_UNITS:
+        raise ValueError(
+            f"I can't read the size '{value}', it should look like 500MB or 2GiB."
+        )
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def estimate_column_bytes(column_type) -> int:
+    """
+    The function `estimate_column_bytes` returns the average size in bytes of a value of a
+    column type. Strings are counted half full, the generated values rarely fill them.
+    """
+    if isinstance(column_type, types.Boolean):
+        return 1
+    if isinstance(column_type, types.Integer):
+        return INTEGER_BITS.get(type(column_type).__name__.upper(), 32) // 8
+    if isinstance(column_type, types.Numeric) and not isinstance(column_type, types.Float):
+        return (column_type.precision or 10) // 2 + 1
+    if isinstance(column_type, (types.Float, types.DateTime, types.Interval)):
+        return 8
+    if isinstance(column_type, (types.Date, types.Time, types.Enum)):
+        return 4
+    if isinstance(column_type, (types.String, types._Binary)):
+        length = getattr(column_type, "length", None)
+        if isinstance(column_type, types._Binary) and length:
+            return length
+        # Texts and blobs without a length get a paragraph
+        return length // 2 + 2 if length else 256
+    if isinstance(column_type, types.JSON):
+        return 256
+    return 16
+
+
+def estimate_row_bytes(table) -> int:
+    """
+    The function `estimate_row_bytes` returns the average size in bytes of a row of a table
+    on disk, estimated from its column types. Indexes aren't counted.
+    """
+    return ROW_OVERHEAD + sum(
+        estimate_column_bytes(column.type) for column in table.columns
+    )
+
+
+def check_row_targets(table_rows, table_names) -> None:
+    """
+    The function `check_row_targets` checks the row targets of `table_rows` before any
+    table is filled, see `resolve_row_targets` for the forms they take.
+    """
+    for table_name, target in table_rows.items():
+        if table_name not in table_names:
+            raise ValueError(
+                f"I can't find the table '{table_name}' of `table_rows` in the database."
+            )
+        if isinstance(target, int) and target >= 0:
+            continue
+        if isinstance(target, dict) and len(target.keys() & {"rows", "per", "bytes"}) == 1:
+            if "per" in target and target["per"] not in table_names:
+                raise ValueError(
+                    f"I can't size table '{table_name}' by table '{target['per']}', "
+                    f"it isn't in the database."
+                )
+            if "bytes" in target:
+                parse_size(target["bytes"])
+            continue
+        raise ValueError(
+            f"I don't understand the row target {target!r} of table '{table_name}', it "
+            f"should be a number of rows, {{'per': 'table', 'ratio': 20}} or "
+            f"{{'bytes': '500MB'}}."
+        )
+
+
+def resolve_row_targets(tables, rows, table_rows, count_rows) -> dict:
+    """
+    The function `resolve_row_targets` returns the number of rows to generate in every table
+    of `tables`, a dict of the tables filled by the run. The target of a table in `table_rows`
+    is one of:
+
+        - A number of rows, or `{"rows": 50}`.
+        - `{"per": "users", "ratio": 20}`: 20 rows per row of the table `users`, which is its
+          own target when it's filled by the run, or the rows it holds already otherwise.
+        - `{"bytes": "500MB"}`: As many rows as fit in that size, from `estimate_row_bytes`.
+
+    The tables not in `table_rows` get `rows` rows. `count_rows` returns the number of rows
+    of a table which isn't filled by the run.
+    """
+    targets = {}
+
+    def resolve(table_name, seen):
+        if table_name in targets:
+            return targets[table_name]
+        if table_name in seen:
+            raise ValueError(
+                f"I can't size the tables {', '.join(sorted(seen))} by each other."
+            )
+
+        target = table_rows.get(table_name, rows)
+        if isinstance(target, int):
+            count = target
+        elif "rows" in target:
+            count = target["rows"]
+        elif "per" in target:
+            parent = target["per"]
+            parent_rows = (
+                resolve(parent, seen | {table_name})
+                if parent in tables
+                else count_rows(parent)
+            )
+            count = round(parent_rows * target.get("ratio", 1))
+        else:
+            count = parse_size(target["bytes"]) // estimate_row_bytes(tables[table_name])
+        targets[table_name] = max(0, int(count))
+        return targets[table_name]
+
+    for table_name in tables:
+        resolve(table_name, frozenset())
+    return targets
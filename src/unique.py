@@ -0,0 +1,183 @@
+import random
+
+from sqlalchemy import types
+
+from .enums import Nothing
+
+Nada = Nothing.Nada.value
+
+# Bits of the integer types, the types not listed here are treated as INTEGER
+INTEGER_BITS = {
+    "TINYINT": 8,
+    "SMALLINT": 16,
+    "MEDIUMINT": 24,
+    "INTEGER": 32,
+    "INT": 32,
+    "BIGINT": 64,
+    "SMALLINTEGER": 16,
+    "BIGINTEGER": 64,
+}
+
+# The digits of the counters appended to strings
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+class IntegerSequence:
+    """
+    The `IntegerSequence` class hands out the integers of a range in a random order without
+    ever repeating one. The n-th value is n passed through a keyed Feistel network, a random
+    permutation of the next power of two, and passed again while it falls outside the range
+    ("cycle walking"). Only a counter is kept, whatever the size of the range.
+
+    A seeded run asks for the value of a `row` instead, which is the row's position passed
+    through the permutation, so rows get the same values however they're split between runs.
+
+    Parameters:
+        - `low` (int): The lowest value of the range.
+        - `high` (int): The highest value of the range.
+        - `seed` (int): The seed of the permutation, a random one by default.
+    """
+
+    # The values don't come from the column's rule
+    uses_generator = False
+    rounds = 4
+
+    def __init__(self, low: int, high: int, seed: int = None) -> None:
+        self.low = low
+        self.capacity = high - low + 1
+        self.index = 0
+
+        # The network works on two halves of the same size
+        bits = max(2, (self.capacity - 1).bit_length())
+        self.half = (bits + 1) // 2
+        self.mask = (1 << self.half) - 1
+        rng = random.Random(seed) if seed is not None else random
+        self.keys = [rng.getrandbits(64) for _ in range(self.rounds)]
+
+    def permute(self, value) -> int:
+        left, right = value >> self.half, value & self.mask
+        for key in self.keys:
+            mixed = ((right ^ key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+            left, right = right, left ^ ((mixed ^ (mixed >> 29)) & self.mask)
+        return (left << self.half) | right
+
+    def value_at(self, index) -> int:
+        value = self.permute(index)
+        while value >= self.capacity:
+            value = self.permute(value)
+        return self.low + value
+
+    def next(self, generated, existing_values, row=None):
+        """
+        The function `next` returns the value of `row` when it's given and free, or else the
+        next value of the permutation which isn't in `existing_values`, or `Nada` once the
+        range is used up.
+        """
+        if row is not None and row < self.capacity:
+            if (value := self.value_at(row)) not in existing_values:
+                return value
+
+        while self.index < self.capacity:
+            value = self.value_at(self.index)
+            self.index += 1
+            if value not in existing_values:
+                return value
+        return Nada
+
+
+class StringSequence:
+    """
+    The `StringSequence` class makes the generated strings of a column unique. A generated
+    value is kept as it is unless it's taken, then a counter is appended to it, encoded in
+    base 36 and cut to the column's length. Counters never repeat, so it doesn't retry.
+
+    A seeded run always appends the position of the row instead, since rows generated by
+    different runs can't see each other's values.
+
+    Parameters:
+        - `length` (int): The length of the column, or None if it has none.
+        - `keyed` (bool): Appends the position of the row to every value.
+    """
+
+    uses_generator = True
+
+    def __init__(self, length: int = None, keyed: bool = False) -> None:
+        self.length = length
+        self.keyed = keyed
+        # Every value of up to `length` base 36 digits
+        self.capacity = (
+            sum(len(DIGITS) ** size for size in range(1, length + 1)) if length else None
+        )
+        self.counter = 0
+
+    def next(self, generated, existing_values, row=None):
+        """
+        The function `next` returns `generated` if it isn't in `existing_values`,
+        or a variant of it with a counter appended otherwise.
+        """
+        if generated is Nada:
+            return Nada
+
+        value = "" if generated is None else str(generated)
+        if self.length:
+            value = value[: self.length]
+        if self.keyed and row is not None:
+            if (candidate := self.with_suffix(value, row)) not in existing_values:
+                return candidate
+        elif value and value not in existing_values:
+            return value
+
+        while True:
+            candidate = self.with_counter(value)
+            if candidate not in existing_values:
+                return candidate
+
+    def with_counter(self, value):
+        self.counter += 1
+        return self.with_suffix(value, self.counter)
+
+    def with_suffix(self, value, number):
+        digits = "" if number else DIGITS[0]
+        while number:
+            number, digit = divmod(number, len(DIGITS))
+            digits = DIGITS[digit] + digits
+
+        suffix = f"-{digits}"
+        if self.length and len(suffix) > self.length:
+            suffix = digits
+        if self.length and len(suffix) > self.length:
+            raise ValueError(
+                f"I ran out of unique values for a column of length {self.length}."
+            )
+
+        if "@" in value:
+            # Emails keep their domain, the counter goes at the end of the local part
+            local, domain = value.split("@", 1)
+            candidate = f"{local}{suffix}@{domain}"
+            if not self.length or len(candidate) <= self.length:
+                return candidate
+
+        room = self.length - len(suffix) if self.length else len(value)
+        return value[:room] + suffix
+
+
+def make_sequence(column, seed=None):
+    """
+    The function `make_sequence` returns the sequence producing the unique values of a
+    column, or None for the types left to the column's rule, such as dates or floats.
+    `seed` is the seed of the column in a seeded run, None otherwise.
+    """
+    column_type = column.type
+    if isinstance(column_type, types.Integer):
+        # The non negative half of the type's range, the whole of it when it's unsigned
+        bits = INTEGER_BITS.get(type(column_type).__name__.upper(), 32)
+        if not getattr(column_type, "unsigned", False):
+            bits -= 1
+        return IntegerSequence(0, 2**bits - 1, seed=seed)
+
+    if isinstance(column_type, types.String) and not isinstance(
+        column_type, types.Enum
+    ):
+        return StringSequence(column_type.length, keyed=seed is not None)
+
+    return None
@@ -0,0 +1,184 @@
+import datetime
+from decimal import Decimal
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class BatchGenerator:
+    """
+    The `BatchGenerator` class is the base of the generators producing a whole column of values
+    with a single NumPy call, they're set as the `batch` of a rule in `data.py`. The array is
+    turned into Python objects the database drivers accept in one pass, once per batch.
+    NumPy is only imported when a batch is generated, so `data.py` can make generators
+    without loading it in the runs that fill tables row by row.
+    """
+
+    def __call__(self, rng, count) -> list:
+        return self.convert(self.generate(rng, count))
+
+    def generate(self, rng, count):
+        """
+        The function `generate` returns an array of `count` values drawn from `rng`,
+        a `numpy.random.Generator`.
+        """
+        raise NotImplementedError
+
+    def convert(self, values) -> list:
+        # `tolist` turns NumPy scalars into ints, floats, bools, dates and datetimes
+        return values.tolist()
+
+
+class Integers(BatchGenerator):
+    """
+    Integers between `low` and `high`, both included, like `fake.random_int`.
+    """
+
+    def __init__(self, low: int, high: int) -> None:
+        self.low = low
+        self.high = high
+
+    def generate(self, rng, count):
+        return rng.integers(self.low, self.high, size=count, endpoint=True)
+
+
+class Floats(BatchGenerator):
+    """
+    Floats between `low` and `high`, rounded to `digits` decimal places when given.
+    """
+
+    def __init__(self, low: float, high: float, digits: int = None) -> None:
+        self.low = low
+        self.high = high
+        self.digits = digits
+
+    def generate(self, rng, count):
+        import numpy
+
+        values = rng.uniform(self.low, self.high, size=count)
+        if self.digits is not None:
+            values = numpy.round(values, self.digits)
+        return values
+
+
+class Choice(BatchGenerator):
+    """
+    Values picked from `elements` with equal chances, like `fake.random_element`.
+    """
+
+    def __init__(self, elements) -> None:
+        self.elements = list(elements)
+        # The array of `elements`, made on the first batch
+        self.array = None
+
+    def generate(self, rng, count):
+        if self.array is None:
+            import numpy
+
+            self.array = numpy.array(self.elements)
+        return rng.choice(self.array, size=count)
+
+
+class Booleans(BatchGenerator):
+    """
+    Booleans which are True `chance` of the time, like `fake.boolean`.
+    """
+
+    def __init__(self, chance: float = 0.5) -> None:
+        self.chance = chance
+
+    def generate(self, rng, count):
+        return rng.random(count) < self.chance
+
+
+class Decimals(BatchGenerator):
+    """
+    Decimals with at most `digits` digits, `scale` of them after the decimal point.
+    """
+
+    def __init__(self, digits: int, scale: int = 2) -> None:
+        self.digits = digits
+        self.scale = scale
+
+    def generate(self, rng, count):
+        return rng.integers(0, 10**self.digits, size=count)
+
+    def convert(self, values) -> list:
+        return [Decimal(value).scaleb(-self.scale) for value in values.tolist()]
+
+
+class DateTimes(BatchGenerator):
+    """
+    Datetimes to the microsecond between `start` and `end`, from the epoch until the start
+    of the day the generator is made by default, like `fake.date_time`. The range is fixed
+    when the generator is made, so a seed gives the same values all day long, and an explicit
+    `end` gives the same values on any day.
+    """
+
+    unit = "us"
+
+    def __init__(self, start: datetime.datetime = EPOCH, end=None) -> None:
+        self.start = start
+        self.end = end or datetime.datetime.combine(datetime.date.today(), datetime.time())
+
+    def generate(self, rng, count):
+        import numpy
+
+        start = numpy.datetime64(self.start, self.unit)
+        end = numpy.datetime64(self.end, self.unit)
+        offsets = rng.integers(0, (end - start).astype(int), size=count, endpoint=True)
+        return start + offsets.astype(f"timedelta64[{self.unit}]")
+
+
+class Dates(DateTimes):
+    """
+    Dates between `start` and `end`, from the epoch until today by default, like `fake.date`.
+    """
+
+    unit = "D"
+
+    def __init__(self, start: datetime.date = EPOCH.date(), end=None) -> None:
+        super().__init__(start, end or datetime.date.today())
+
+
+class UUIDs(BatchGenerator):
+    """
+    Random (version 4) UUIDs as strings, like `str(uuid.uuid4())`.
+    """
+
+    def generate(self, rng, count):
+        import numpy
+
+        # `frombuffer` arrays are read only, the version bits are set on a copy
+        values = numpy.frombuffer(rng.bytes(16 * count), dtype=numpy.uint8)
+        values = values.reshape(count, 16).copy()
+        values[:, 6] = values[:, 6] & 0x0F | 0x40
+        values[:, 8] = values[:, 8] & 0x3F | 0x80
+        return values
+
+    def convert(self, values) -> list:
+        digits = values.tobytes().hex()
+        return [
+            f"{digits[i:i + 8]}-{digits[i + 8:i + 12]}-{digits[i + 12:i + 16]}-"
+            f"{digits[i + 16:i + 20]}-{digits[i + 20:i + 32]}"
+            for i in range(0, len(digits), 32)
+        ]
+
+
+class RandomBytes(BatchGenerator):
+    """
+    Random byte strings of `length` bytes, like `os.urandom`.
+    """
+
+    def __init__(self, length: int) -> None:
+        self.length = length
+
+    def generate(self, rng, count):
+        import numpy
+
+        return numpy.frombuffer(rng.bytes(self.length * count), dtype=numpy.uint8)
+
+    def convert(self, values) -> list:
+        data = values.tobytes()
+        return [
+            data[i : i + self.length] for i in range(0, len(data), self.length)
+        ]